@@ -1,7 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import os
-from delusion import activate_delusion as run_audit_for_plot
+from parametric import survival_curve
 from burst import subjects
 
 hp_ranges = np.linspace(10000, 1000000, 20)
@@ -9,19 +9,12 @@ hp_ranges = np.linspace(10000, 1000000, 20)
 plt.figure(figsize=(12, 7))
 
 for sub in subjects:
-    costs = []
-    hps = []
     budget = np.exp(-0.012 * sub["age"]) - 0.15 #
     
-    for hp in hp_ranges:
-        # We use a modified version of your audit that returns the 'res.fun' (cost)
-        cost = run_audit_for_plot(sub["name"], sub["age"], sub["vis"], sub["eff"], hp, silent=True)
-        if cost and cost <= budget:
-            costs.append(cost)
-            hps.append(hp)
-        else:
-            # If they die, we stop the line to show the 'Mortality Cliff'
-            break
+    # One parametric model per subject; the line stops at the first collapse
+    # to show the 'Mortality Cliff'
+    hps, costs = survival_curve(sub["age"], sub["vis"], sub["eff"], hp_ranges)
+    hps, costs = list(hps), list(costs)
     
     # Ensure line is visible even if they die instantly
     if len(hps) == 0:
@@ -1,7 +1,7 @@
 try:
-    from .delusion import activate_delusion
+    from .roster import roster_from_subjects
 except ImportError:
-    from Delusion.delusion import activate_delusion
+    from Delusion.roster import roster_from_subjects
 
 subjects = [
     {"name": "Childe", "age": 23, "vis": True, "eff": 0.65, "color": "#e67e22"},
@@ -9,7 +9,16 @@ subjects = [
     {"name": "Foolish NPC", "age": 16, "vis": False, "eff": 0.05, "color": "#7f8c8d"}
 ]
 
+# Columnar view of the benchmark subjects for vectorized stats and audits
+roster = roster_from_subjects(subjects)
+
 if __name__ == "__main__":
+    # Imported here so the benchmark roster stays cheap (no scipy) to import
+    try:
+        from .delusion import activate_delusion
+    except ImportError:
+        from Delusion.delusion import activate_delusion
+
     activate_delusion("Childe", 23, True, 0.65)
     print("--------------------------------")
     activate_delusion("Arlecchino", 30, True, 0.95)
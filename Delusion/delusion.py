@@ -1,42 +1,33 @@
 from scipy.optimize import linprog
-import numpy as np
+try:
+    from .roster import subject_stats
+except ImportError:
+    # Allow running as a script
+    from roster import subject_stats
+
+def activate_delusion(name, age, has_vision, efficiency, boss_hp=500000, max_time=90, silent=False, vitality=1.0):
+    # 1-3. Biological Buffer, Mastery-Scaled Combat Mechanics and Forensic
+    # Multipliers are shared with the columnar roster (see roster.subject_stats);
+    # vitality < 1 shrinks the buffer of a subject weakened by Eleazar
+    stats = subject_stats(age, has_vision, efficiency, vitality)
+    budget = float(stats["budget"])
+    cooldown = float(stats["cooldown"])
+    burst_req = float(stats["burst_req"])
+    energy_per_E = float(stats["energy_per_E"])
 
-def activate_delusion(name, age, has_vision, efficiency, boss_hp=500000, max_time=90, silent=False):
-    # 1. Biological Buffer (Gavrilov Reliability Logic)
-    initial_R = np.exp(-0.012 * age) #
-    budget = initial_R - 0.15 #
-    
-    # 2. Mastery-Scaled Combat Mechanics
-    cooldown = 12 - (5 * efficiency) #
-    burst_req = 90 - (10 * efficiency) #
-    
-    # Energy generation is now experience-scaled + Vision multiplier
-    base_energy = 10 + (17 * efficiency) + (8 * efficiency * efficiency) - 0.34 * age 
-    energy_per_E = base_energy * (1.5 if has_vision else 1.0) #
-    
-    # 3. Forensic Multipliers (The 'Human Tax')
-    k_age = np.exp(0.012 * (age - 20)) #
-    zeta = 0.05 if has_vision else 1.0 # Vision Grounding
-    waste = (1.0 - efficiency) * zeta * k_age #
-    
     # 4. Decision Variables: [t_NA (sec), n_E (count), n_Q (count)]
-    # 1. Jack up base cost by 50x
     # 0.005 means a baseline human loses 0.3 redundancy (half their budget) in 60s of NA
-    base_cost_sec = 0.005 * waste 
-    
-    # 2. Scale Action Spikes
-    # Skills now cost a flat 1% of total potential redundancy per cast
-    cost_E = 0.01 * waste 
-    
-    # 3. The 'Human Tax' of the Burst
-    # At 350x toxicity for 5 seconds, this is the 'Mortality Cliff'
-    cost_Q_total = (350 * base_cost_sec * 5)
+    base_cost_sec = float(stats["base_cost_sec"])
+    # Skills cost a flat 1% of total potential redundancy per cast
+    cost_E = float(stats["cost_E"])
+    # The 'Human Tax' of the Burst: 350x toxicity for 5 seconds, the 'Mortality Cliff'
+    cost_Q_total = float(stats["cost_Q_total"])
     
     # Objective: Minimize Time to Victory (Efficiency Optimization)
     c = [1, 1.5, 5] 
 
     # 5. Constraints Matrix
-    dmg_mult = 2.0 if has_vision else 1.0
+    dmg_mult = float(stats["dmg_mult"])
     A_ub = [
         [base_cost_sec, cost_E, cost_Q_total], # Redundancy <= Budget
         [-(300 * dmg_mult), -(11000 * dmg_mult), -(100000 * dmg_mult)], # Damage >= Boss_HP
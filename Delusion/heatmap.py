@@ -2,29 +2,23 @@ import numpy as np
 import matplotlib.pyplot as plt
 import os
 from mpl_toolkits.mplot3d import Axes3D
-from delusion import activate_delusion
+from roster import make_roster, batch_audit
 
 # Assuming ultimate_forensic_audit returns the 'remaining_R'
 def generate_3d_survival_ridge():
     efficiencies = np.linspace(0.05, 0.95, 20)
     hps = np.linspace(100000, 1500000, 20)
     X, Y = np.meshgrid(efficiencies, hps)
-    Z = np.zeros(X.shape)
 
-    for i in range(len(hps)):
-        for j in range(len(efficiencies)):
-            # Simulate a 25-year-old with/without vision based on efficiency tier
-            has_vision = X[i, j] > 0.6
-            result_cost = activate_delusion("Subject", age=25, has_vision=has_vision, 
-                                          efficiency=X[i, j], boss_hp=Y[i, j], silent=True)
-            
-            initial_R = np.exp(-0.012 * 25)
-            if result_cost is not None:
-                remaining = initial_R - result_cost
-                # Cap at 0.15 for the 'Death Valley' visualization
-                Z[i, j] = max(0.15, remaining)
-            else:
-                Z[i, j] = 0.15
+    # Simulate a 25-year-old with/without vision based on efficiency tier,
+    # auditing the whole grid as one columnar roster
+    roster = make_roster(["Subject"] * X.size, np.full(X.size, 25), X.ravel() > 0.6, X.ravel())
+    audit = batch_audit(roster, boss_hp=Y.ravel())
+
+    initial_R = np.exp(-0.012 * 25)
+    remaining = np.where(audit["feasible"], initial_R - audit["cost"], 0.15)
+    # Cap at 0.15 for the 'Death Valley' visualization
+    Z = np.maximum(0.15, remaining).reshape(X.shape)
 
     fig = plt.figure(figsize=(12, 8))
     ax = fig.add_subplot(111, projection='3d')
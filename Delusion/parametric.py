@@ -0,0 +1,158 @@
+import numpy as np
+try:
+    from .roster import subject_stats, _rotation_candidates, AUDIT_DTYPE, OBJECTIVE, DAMAGE
+except ImportError:
+    # Allow running as a script
+    from roster import subject_stats, _rotation_candidates, AUDIT_DTYPE, OBJECTIVE, DAMAGE
+
+# Points where the optimal rotation changes; n_E/n_Q of -1 means "no survivable rotation"
+BREAKPOINT_DTYPE = np.dtype([
+    ("hp", "f8"),
+    ("n_E_before", "i8"),
+    ("n_Q_before", "i8"),
+    ("n_E_after", "i8"),
+    ("n_Q_after", "i8"),
+])
+
+
+def build_hp_model(age, has_vision, efficiency, max_time=90):
+    """
+    Builds the parametric Delusion model for one subject.
+
+    Only the damage right-hand side (boss_hp) varies across a sweep, so every
+    hp-independent constraint (Skill cooldown cap, energy flow, the fixed
+    Skill/Burst part of the cost and time) is applied once here. What is left
+    is the short list of integer rotations that can ever be optimal, each one
+    a function of boss_hp that is flat until its Skills/Bursts stop covering
+    the HP and then grows linearly with the NA time needed.
+    """
+    stats = {k: float(v) for k, v in subject_stats(age, has_vision, efficiency).items()}
+    n_e, n_q = _rotation_candidates(max_time, stats["cooldown"])
+
+    fixed_time = OBJECTIVE[1] * n_e + OBJECTIVE[2] * n_q
+    fixed_cost = n_e * stats["cost_E"] + n_q * stats["cost_Q_total"]
+    keep = (
+        (n_e <= max_time / stats["cooldown"])
+        & (stats["burst_req"] * n_q <= stats["energy_per_E"] * n_e)
+        & (fixed_cost <= stats["budget"])
+    )
+    n_e, n_q = n_e[keep], n_q[keep]
+
+    # Seconds of NA until each rotation runs out of time or budget
+    na_limit = np.minimum(max_time, max_time - fixed_time[keep])
+    if stats["base_cost_sec"] > 0:
+        na_limit = np.minimum(na_limit, (stats["budget"] - fixed_cost[keep]) / stats["base_cost_sec"])
+
+    na_rate = DAMAGE[0] * stats["dmg_mult"]
+    covered = stats["dmg_mult"] * (DAMAGE[1] * n_e + DAMAGE[2] * n_q)
+    return {
+        "stats": stats,
+        "max_time": max_time,
+        "n_E": n_e,
+        "n_Q": n_q,
+        "fixed_time": fixed_time[keep],
+        # boss_hp covered without NA, and the last boss_hp each rotation survives
+        "hp_covered": covered,
+        "hp_limit": covered + na_rate * na_limit,
+        "na_rate": na_rate,
+    }
+
+
+def evaluate_hp_model(model, boss_hps, chunk_size=4096):
+    """
+    Evaluates a model from build_hp_model at every boss_hp in one pass.
+    Returns an AUDIT_DTYPE array in the same layout as batch_audit.
+    """
+    boss_hps = np.atleast_1d(np.asarray(boss_hps, dtype=float))
+    result = np.empty(boss_hps.shape[0], dtype=AUDIT_DTYPE)
+    for start in range(0, boss_hps.shape[0], chunk_size):
+        hp = boss_hps[start:start + chunk_size]
+        result[start:start + chunk_size] = _evaluate(model, hp)
+    return result
+
+
+def _evaluate(model, boss_hps):
+    stats = model["stats"]
+    n_e = model["n_E"][:, None]
+    n_q = model["n_Q"][:, None]
+
+    # Same arithmetic as roster._audit_chunk, so both paths agree bit for bit
+    hp_per_na = boss_hps[None, :] / (DAMAGE[0] * stats["dmg_mult"])
+    t_na = np.maximum(0.0, hp_per_na - (n_e * (DAMAGE[1] / DAMAGE[0]) + n_q * (DAMAGE[2] / DAMAGE[0])))
+    time = t_na + (OBJECTIVE[1] * n_e + OBJECTIVE[2] * n_q)
+    cost = t_na * stats["base_cost_sec"] + n_e * stats["cost_E"] + n_q * stats["cost_Q_total"]
+    ok = (time <= model["max_time"]) & (cost <= stats["budget"])
+
+    result = np.empty(boss_hps.shape[0], dtype=AUDIT_DTYPE)
+    result["feasible"] = ok.any(axis=0) if ok.size else False
+    if not ok.size:
+        result["cost"] = result["time"] = result["t_NA"] = np.nan
+        result["n_E"] = result["n_Q"] = -1
+        return result
+
+    # First fastest candidate wins ties, as in batch_audit
+    best = np.argmin(np.where(ok, time, np.inf), axis=0)
+    cols = np.arange(boss_hps.shape[0])
+    feasible = result["feasible"]
+    result["cost"] = np.where(feasible, cost[best, cols], np.nan)
+    result["time"] = np.where(feasible, time[best, cols], np.nan)
+    result["t_NA"] = np.where(feasible, t_na[best, cols], np.nan)
+    result["n_E"] = np.where(feasible, model["n_E"][best], -1)
+    result["n_Q"] = np.where(feasible, model["n_Q"][best], -1)
+    return result
+
+
+def hp_breakpoints(model, hp_min, hp_max):
+    """
+    Finds every boss_hp in [hp_min, hp_max] where the optimal rotation changes.
+
+    The optimum can only switch where some rotation starts needing NA, where
+    it runs out of time/budget, or where a flat rotation meets a sloped one
+    (all sloped rotations share the NA slope, so they never cross each other).
+    Checking the rotation between consecutive critical points is exact.
+    """
+    covered, limit = model["hp_covered"], model["hp_limit"]
+    fixed_time, na_rate = model["fixed_time"], model["na_rate"]
+    crossings = covered[None, :] + na_rate * (fixed_time[:, None] - fixed_time[None, :])
+    critical = np.concatenate([covered, limit, crossings.ravel()])
+    critical = np.unique(critical[(critical > hp_min) & (critical < hp_max)])
+    if critical.size == 0:
+        return np.empty(0, dtype=BREAKPOINT_DTYPE)
+
+    edges = np.concatenate([[hp_min], critical, [hp_max]])
+    probes = evaluate_hp_model(model, 0.5 * (edges[:-1] + edges[1:]))
+    changed = (probes["n_E"][1:] != probes["n_E"][:-1]) | (probes["n_Q"][1:] != probes["n_Q"][:-1])
+
+    breakpoints = np.empty(int(changed.sum()), dtype=BREAKPOINT_DTYPE)
+    breakpoints["hp"] = critical[changed]
+    breakpoints["n_E_before"] = probes["n_E"][:-1][changed]
+    breakpoints["n_Q_before"] = probes["n_Q"][:-1][changed]
+    breakpoints["n_E_after"] = probes["n_E"][1:][changed]
+    breakpoints["n_Q_after"] = probes["n_Q"][1:][changed]
+    return breakpoints
+
+
+def hp_sweep(age, has_vision, efficiency, boss_hps, max_time=90):
+    """
+    Parametric replacement for calling activate_delusion once per boss_hp.
+    Builds the subject's model once and returns (curve, breakpoints):
+    the AUDIT_DTYPE result at each boss_hp and the exact boss_hp values
+    in between where the optimal number of Skills/Bursts changes.
+    """
+    boss_hps = np.atleast_1d(np.asarray(boss_hps, dtype=float))
+    model = build_hp_model(age, has_vision, efficiency, max_time)
+    curve = evaluate_hp_model(model, boss_hps)
+    breakpoints = hp_breakpoints(model, float(boss_hps.min()), float(boss_hps.max()))
+    return curve, breakpoints
+
+
+def survival_curve(age, has_vision, efficiency, boss_hps, max_time=90):
+    """
+    Cost-vs-HP line for the forensic plots: the boss_hps (and costs) the
+    subject survives, stopping at the first collapse (the 'Mortality Cliff').
+    """
+    boss_hps = np.atleast_1d(np.asarray(boss_hps, dtype=float))
+    curve = evaluate_hp_model(build_hp_model(age, has_vision, efficiency, max_time), boss_hps)
+    collapsed = np.flatnonzero(~curve["feasible"])
+    alive = collapsed[0] if collapsed.size else boss_hps.shape[0]
+    return boss_hps[:alive], curve["cost"][:alive]
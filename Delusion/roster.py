@@ -0,0 +1,228 @@
+import numpy as np
+
+# Columnar subject roster: one row per subject, one field per input attribute
+ROSTER_DTYPE = np.dtype([
+    ("name", "U32"),
+    ("age", "f8"),
+    ("vis", "?"),
+    ("eff", "f8"),
+    ("vit", "f8"),  # remaining vitality in [0, 1] (1.0 unless set by the cohort pipeline)
+])
+
+# Derived combat/biology columns, same names as the locals in activate_delusion
+STATS_DTYPE = np.dtype([
+    ("initial_R", "f8"),
+    ("budget", "f8"),
+    ("cooldown", "f8"),
+    ("burst_req", "f8"),
+    ("energy_per_E", "f8"),
+    ("k_age", "f8"),
+    ("zeta", "f8"),
+    ("waste", "f8"),
+    ("base_cost_sec", "f8"),
+    ("cost_E", "f8"),
+    ("cost_Q_total", "f8"),
+    ("dmg_mult", "f8"),
+])
+
+# Result columns of a batch audit
+AUDIT_DTYPE = np.dtype([
+    ("feasible", "?"),
+    ("cost", "f8"),
+    ("time", "f8"),
+    ("t_NA", "f8"),
+    ("n_E", "i8"),
+    ("n_Q", "i8"),
+])
+
+# Objective weights for [t_NA, n_E, n_Q] (Minimize Time to Victory)
+OBJECTIVE = (1.0, 1.5, 5.0)
+# Damage per second of NA, per Skill, per Burst (before the Vision multiplier)
+DAMAGE = (300.0, 11000.0, 100000.0)
+
+
+def subject_stats(age, has_vision, efficiency, vitality=1.0):
+    """
+    Derives every Delusion stat from (age, vision, efficiency).
+    Accepts scalars or equally-shaped arrays and returns a dict of arrays,
+    so the same formulas serve one subject or a million.
+    vitality scales the Biological Buffer, e.g. the share of Vitality a
+    subject has left after Eleazar (1.0 is a healthy subject).
+    """
+    age = np.asarray(age, dtype=float)
+    has_vision = np.asarray(has_vision, dtype=bool)
+    efficiency = np.asarray(efficiency, dtype=float)
+
+    # 1. Biological Buffer (Gavrilov Reliability Logic)
+    initial_R = np.exp(-0.012 * age) * np.asarray(vitality, dtype=float)
+    budget = initial_R - 0.15
+
+    # 2. Mastery-Scaled Combat Mechanics
+    cooldown = 12 - (5 * efficiency)
+    burst_req = 90 - (10 * efficiency)
+    base_energy = 10 + (17 * efficiency) + (8 * efficiency * efficiency) - 0.34 * age
+    energy_per_E = base_energy * np.where(has_vision, 1.5, 1.0)
+
+    # 3. Forensic Multipliers (The 'Human Tax')
+    k_age = np.exp(0.012 * (age - 20))
+    zeta = np.where(has_vision, 0.05, 1.0)
+    waste = (1.0 - efficiency) * zeta * k_age
+
+    base_cost_sec = 0.005 * waste
+    cost_E = 0.01 * waste
+    cost_Q_total = (350 * base_cost_sec * 5)
+
+    return {
+        "initial_R": initial_R,
+        "budget": budget,
+        "cooldown": cooldown,
+        "burst_req": burst_req,
+        "energy_per_E": energy_per_E,
+        "k_age": k_age,
+        "zeta": zeta,
+        "waste": waste,
+        "base_cost_sec": base_cost_sec,
+        "cost_E": cost_E,
+        "cost_Q_total": cost_Q_total,
+        "dmg_mult": np.where(has_vision, 2.0, 1.0),
+    }
+
+
+def make_roster(names, ages, visions, efficiencies, vitalities=1.0):
+    """Builds a columnar roster from parallel sequences of subject attributes."""
+    ages = np.asarray(ages, dtype=float)
+    roster = np.empty(ages.shape[0], dtype=ROSTER_DTYPE)
+    roster["name"] = names
+    roster["age"] = ages
+    roster["vis"] = visions
+    roster["eff"] = efficiencies
+    roster["vit"] = vitalities
+    return roster
+
+
+def roster_from_subjects(subjects):
+    """Converts a list of subject dicts (name/age/vis/eff and optional vit keys) into a roster."""
+    return make_roster(
+        [s["name"] for s in subjects],
+        [s["age"] for s in subjects],
+        [s["vis"] for s in subjects],
+        [s["eff"] for s in subjects],
+        [s.get("vit", 1.0) for s in subjects],
+    )
+
+
+def derive_stats(roster):
+    """Derives the STATS_DTYPE columns for every subject in one vectorized pass."""
+    columns = subject_stats(roster["age"], roster["vis"], roster["eff"], roster["vit"])
+    stats = np.empty(roster.shape[0], dtype=STATS_DTYPE)
+    for field in STATS_DTYPE.names:
+        stats[field] = columns[field]
+    return stats
+
+
+def _rotation_candidates(max_time, min_cooldown):
+    """
+    Enumerates every integer (n_E, n_Q) pair that can fit inside max_time.
+    The objective charges 1.5s per Skill and 5s per Burst, and Skills are
+    also capped by max_time / cooldown, so the integer search space is tiny.
+    """
+    max_q = int(np.floor(max_time / OBJECTIVE[2]))
+    max_e = int(np.floor(max_time / min_cooldown))
+    n_e, n_q = np.meshgrid(np.arange(0, max_e + 1), np.arange(1, max_q + 1), indexing="ij")
+    n_e, n_q = n_e.ravel(), n_q.ravel()
+    fits = OBJECTIVE[1] * n_e + OBJECTIVE[2] * n_q <= max_time
+    return n_e[fits], n_q[fits]
+
+
+def batch_audit(roster, boss_hp=500000, max_time=90, stats=None, chunk_size=65536):
+    """
+    Audits every subject of a roster against boss_hp in one vectorized pass.
+
+    The MILP in activate_delusion has only two integer variables (n_E, n_Q)
+    with small bounds, and for a fixed (n_E, n_Q) the optimal t_NA is just
+    the damage shortfall divided by NA damage. Enumerating the integer
+    rotations and keeping the fastest feasible one per subject gives the
+    exact optimum without calling the solver.
+
+    boss_hp may be a scalar or one value per subject.
+    Returns an AUDIT_DTYPE array; cost/time/t_NA are NaN and n_E/n_Q are -1
+    where the subject cannot survive the fight.
+    """
+    if stats is None:
+        stats = derive_stats(roster)
+    n = stats.shape[0]
+    boss_hp = np.broadcast_to(np.asarray(boss_hp, dtype=float), (n,))
+
+    result = np.empty(n, dtype=AUDIT_DTYPE)
+    result["feasible"] = False
+    result["cost"] = np.nan
+    result["time"] = np.nan
+    result["t_NA"] = np.nan
+    result["n_E"] = -1
+    result["n_Q"] = -1
+
+    # A single Burst must be both affordable and chargeable within max_time,
+    # otherwise no rotation can work; skip those subjects up front
+    max_e = max_time / stats["cooldown"]
+    viable = (
+        (stats["cost_Q_total"] <= stats["budget"])
+        & (stats["burst_req"] <= stats["energy_per_E"] * np.floor(max_e))
+    )
+    rows = np.flatnonzero(viable)
+    if rows.size == 0:
+        return result
+
+    n_e, n_q = _rotation_candidates(max_time, float(stats["cooldown"][rows].min()))
+    for start in range(0, rows.size, chunk_size):
+        idx = rows[start:start + chunk_size]
+        result[idx] = _audit_chunk(stats[idx], boss_hp[idx], max_time, n_e, n_q)
+    return result
+
+
+def _audit_chunk(stats, boss_hp, max_time, candidates_e, candidates_q):
+    """Keeps the fastest feasible rotation per subject over all candidates."""
+    budget = stats["budget"]
+    burst_req = stats["burst_req"]
+    energy_per_E = stats["energy_per_E"]
+    base_cost_sec = stats["base_cost_sec"]
+    cost_E = stats["cost_E"]
+    cost_Q_total = stats["cost_Q_total"]
+    max_e = max_time / stats["cooldown"]
+
+    # Damage each subject must cover, expressed in seconds of NA
+    hp_per_na = boss_hp / (DAMAGE[0] * stats["dmg_mult"])
+    skill_na = DAMAGE[1] / DAMAGE[0]
+    burst_na = DAMAGE[2] / DAMAGE[0]
+
+    n = stats.shape[0]
+    best_time = np.full(n, np.inf)
+    best_cost = np.full(n, np.nan)
+    best_t = np.full(n, np.nan)
+    best_e = np.full(n, -1, dtype=np.int64)
+    best_q = np.full(n, -1, dtype=np.int64)
+
+    for n_e, n_q in zip(candidates_e, candidates_q):
+        t_na = np.maximum(0.0, hp_per_na - (n_e * skill_na + n_q * burst_na))
+        time = t_na + (OBJECTIVE[1] * n_e + OBJECTIVE[2] * n_q)
+        cost = t_na * base_cost_sec + n_e * cost_E + n_q * cost_Q_total
+        ok = (
+            (time < best_time)
+            & (time <= max_time)
+            & (cost <= budget)
+            & (n_e <= max_e)
+            & (burst_req * n_q <= energy_per_E * n_e)
+        )
+        best_time[ok] = time[ok]
+        best_cost[ok] = cost[ok]
+        best_t[ok] = t_na[ok]
+        best_e[ok] = n_e
+        best_q[ok] = n_q
+
+    chunk = np.empty(n, dtype=AUDIT_DTYPE)
+    chunk["feasible"] = np.isfinite(best_time)
+    chunk["cost"] = best_cost
+    chunk["time"] = np.where(chunk["feasible"], best_time, np.nan)
+    chunk["t_NA"] = best_t
+    chunk["n_E"] = best_e
+    chunk["n_Q"] = best_q
+    return chunk
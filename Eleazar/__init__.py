@@ -1,6 +1,6 @@
 """Eleazar package for modeling Eleazar disease progression."""
 
 from .eleazar import eleazar_model
-from .solver import run_simulation
+from .solver import run_simulation, BASE_PARAMS, INITIAL_CONDITIONS
 
-__all__ = ['eleazar_model', 'run_simulation']
+__all__ = ['eleazar_model', 'run_simulation', 'BASE_PARAMS', 'INITIAL_CONDITIONS']
@@ -12,6 +12,17 @@ except ImportError:
     # Allow running as a script
     from eleazar import eleazar_model
 
+# [regen, drain, corruption_rate, scale_drag, ossification]
+# Parameter set for "Chronic Struggle" - Phase 2 "Final Exam"
+BASE_PARAMS = [0.12, 0.06, 0.22, 0.04, 0.08]
+
+# Initial contamination scenarios: [V_0, C_0, S_0]
+INITIAL_CONDITIONS = {
+    "Heavy": [84.0, 20.0, 12.0],
+    "Medium": [86.0, 12.0, 8.0],
+    "Light": [90.0, 5.0, 2.0]
+}
+
 def run_simulation(scenarios, days=120):
     """
     Runs a simulation of the Eleazar model for a given set of scenarios.
@@ -23,9 +34,7 @@ def run_simulation(scenarios, days=120):
     Returns: A tuple containing the time array and a dictionary of results.
     """
     t = np.linspace(0, days, 1200)
-    # [regen, drain, corruption_rate, scale_drag, ossification]
-    # Parameter set for "Chronic Struggle" - Phase 2 "Final Exam"
-    base_params = [0.12, 0.06, 0.22, 0.04, 0.08] 
+    base_params = BASE_PARAMS
     
     results = {}
     for sc in tqdm(scenarios, desc="Running simulations", unit="scenario"):
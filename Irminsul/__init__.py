@@ -2,5 +2,7 @@
 
 from .constants import ELEMENTS, BASE_MATRIX, EMISSION_MATRIX, OBS_MAP
 from .nahida import trikarma_purification
+from .records import encode_record, decode_codes, compare_records, OBSERVATIONS, OBS_TABLE, STATE_TABLE
 
-__all__ = ['ELEMENTS', 'BASE_MATRIX', 'EMISSION_MATRIX', 'OBS_MAP', 'trikarma_purification']
+__all__ = ['ELEMENTS', 'BASE_MATRIX', 'EMISSION_MATRIX', 'OBS_MAP', 'trikarma_purification',
+           'encode_record', 'decode_codes', 'compare_records', 'OBSERVATIONS', 'OBS_TABLE', 'STATE_TABLE']
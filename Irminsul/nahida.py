@@ -14,7 +14,7 @@ def trikarma_purification(
 ):
     """
     Restores the true elemental sequence from a withered record.
-    obs_sequence: List of indices corresponding to observations (0-7)
+    obs_sequence: List or integer array of indices corresponding to observations (0-7)
     base_matrix: 7x7 transition matrix between elements
     emission_matrix: 7x8 emission matrix for observations
     states: List of possible elemental states (P, H, E, C, A, D, G)
@@ -24,34 +24,36 @@ def trikarma_purification(
     This function implements the Viterbi algorithm to find the most likely sequence of states.
     """
     n_states, n_obs = len(states), len(obs_sequence)
+    obs_sequence = np.asarray(obs_sequence, dtype=np.intp)
 
-    # Initialize the Viterbi and Backpointer matrices
-    viterbi = np.zeros((n_states, n_obs))
-    backpointer = np.zeros((n_states, n_obs), dtype=int)
+    # Log-space model, computed once instead of once per (step, state)
+    with np.errstate(divide='ignore'):
+        log_transition = np.log(base_matrix)
+        log_emission = np.log(emission_matrix)
+
+    # Only the previous column of the Viterbi matrix is needed; backpointers
+    # fit in uint8 (n_states <= 256), so memory stays ~n_obs * n_states bytes
+    backpointer = np.zeros((n_obs, n_states), dtype=np.uint8)
 
     # Initialization (Time step 0)
     # Assume equal probability for the starting element (1/7)
     with np.errstate(divide='ignore'):
-        for s in range(n_states):
-            viterbi[s, 0] = np.log(1/n_states) + np.log(emission_matrix[s, obs_sequence[0]])
+        viterbi = np.log(1/n_states) + log_emission[:, obs_sequence[0]]
 
-    # Recursion (Time steps 1 to T)
-    with np.errstate(divide='ignore'):
-        for t in range(1, n_obs):
-            for s in range(n_states):
-                # Calculate prob of moving from every 'prev_s' to current 's'
-                # using log-space to avoid underflow
-                log_probs = viterbi[:, t-1] + np.log(base_matrix[:, s]) + np.log(emission_matrix[s, obs_sequence[t]])
-                viterbi[s, t] = np.max(log_probs)
-                backpointer[s, t] = np.argmax(log_probs)
+    # Recursion (Time steps 1 to T), all states at once:
+    # scores[prev_s, s] = viterbi[prev_s] + log A[prev_s, s] + log B[s, obs]
+    for t in range(1, n_obs):
+        scores = viterbi[:, None] + log_transition + log_emission[:, obs_sequence[t]]
+        backpointer[t] = scores.argmax(axis=0)
+        viterbi = scores.max(axis=0)
 
     # Termination & Path Reconstruction
-    best_path = np.zeros(n_obs, dtype=int)
-    best_path[-1] = np.argmax(viterbi[:, -1])
+    best_path = np.zeros(n_obs, dtype=np.uint8)
+    best_path[-1] = np.argmax(viterbi)
 
     # Backtrack to find the most likely sequence of states
     for t in range(n_obs-2, -1, -1):
-        best_path[t] = backpointer[best_path[t+1], t+1]
+        best_path[t] = backpointer[t+1, best_path[t+1]]
 
     if return_indices:
         return [states[s] for s in best_path], best_path
@@ -0,0 +1,62 @@
+import numpy as np
+try:
+    from .constants import ELEMENTS, OBS_MAP
+except ImportError:
+    # Allow running as a script
+    from constants import ELEMENTS, OBS_MAP
+
+# Marks bytes that are not part of an alphabet in a translation table
+INVALID = 255
+# Line breaks and spaces are ignored, so records can be wrapped in files
+WHITESPACE = b" \t\r\n"
+
+
+def translation_table(symbols):
+    """
+    256-entry byte -> code table for a list of single-character symbols.
+    Both cases map to the symbol's index; every other byte maps to INVALID.
+    """
+    table = np.full(256, INVALID, dtype=np.uint8)
+    for code, symbol in enumerate(symbols):
+        table[ord(symbol.upper())] = code
+        table[ord(symbol.lower())] = code
+    return table
+
+
+# Observation symbols in code order (the seven elements, then W)
+OBSERVATIONS = sorted(OBS_MAP, key=OBS_MAP.get)
+
+OBS_TABLE = translation_table(OBSERVATIONS)
+STATE_TABLE = translation_table(ELEMENTS)
+
+
+def encode_record(record, table=OBS_TABLE):
+    """
+    Encodes a record (str or bytes) into a uint8 array of codes in one pass.
+    Returns (codes, invalid_positions): positions index the record as given
+    (byte offsets of a file, whitespace included), and codes, which skip the
+    whitespace, are only meaningful if there are none.
+    """
+    if isinstance(record, str):
+        record = record.encode("ascii", errors="replace")
+    data = np.frombuffer(record, dtype=np.uint8)
+    codes = table[data]
+    invalid = codes == INVALID
+    space = np.isin(data, np.frombuffer(WHITESPACE, dtype=np.uint8))
+    if space.any():
+        invalid &= ~space
+        codes = codes[~space]
+    return codes, np.flatnonzero(invalid)
+
+
+def decode_codes(codes, symbols=ELEMENTS):
+    """Inverse of encode_record: uint8 codes back to a string of symbols."""
+    alphabet = np.frombuffer("".join(symbols).encode("ascii"), dtype=np.uint8)
+    return alphabet[np.asarray(codes, dtype=np.intp)].tobytes().decode("ascii")
+
+
+def compare_records(pure_codes, path_indices):
+    """Returns (accuracy in [0, 1], mismatch positions) of a reconstruction against the pure record."""
+    mismatches = np.flatnonzero(np.asarray(pure_codes) != np.asarray(path_indices))
+    total = len(pure_codes)
+    return ((total - mismatches.shape[0]) / total if total else 0.0), mismatches
@@ -1,11 +1,13 @@
 import os
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
 try:
     from .constants import ELEMENTS
 except ImportError:
     from constants import ELEMENTS
 
-def plot_viterbi_trellis(obs_sequence, states, best_path_indices, output_path=None, pure_record=None):
+def plot_viterbi_trellis(obs_sequence, states, best_path_indices, output_path=None, pure_record=None, offset=None):
     """
     Generates a trellis diagram for the Irminsul reconstruction.
     
@@ -13,75 +15,79 @@ def plot_viterbi_trellis(obs_sequence, states, best_path_indices, output_path=No
         obs_sequence: String of observed characters (e.g., "DEWEPWHWG")
         states: List of state names (e.g., ['P', 'H', 'E', 'C', 'A', 'D', 'G'])
         best_path_indices: List of state indices for the best path (reconstructed)
-        output_path: Optional path to save the figure. If None, displays the figure.
+        output_path: Optional path to save the figure. If None, returns the Figure.
         pure_record: Optional string of the pure/original record to overlay if it differs
+        offset: Optional position of obs_sequence[0] in a longer record; the trellis
+            is then drawn as a window (absolute positions on the x axis)
     """
     n_states = len(states)
     n_obs = len(obs_sequence)
+    path = np.asarray(best_path_indices, dtype=int)
+    xs = np.arange(n_obs) + (offset or 0)
     
     # Convert pure_record to indices if provided
-    pure_path_indices = None
+    pure_path = None
     if pure_record and len(pure_record) == n_obs:
         try:
-            pure_path_indices = [states.index(char) for char in pure_record]
+            pure_path = np.array([states.index(char) for char in pure_record], dtype=int)
         except (ValueError, IndexError):
-            pure_path_indices = None
+            pure_path = None
+    # Where the pure path differs from the reconstruction
+    differs = pure_path != path if pure_path is not None else np.zeros(n_obs, dtype=bool)
     
-    plt.figure(figsize=(12, 6))
+    # Explicit Figure (not pyplot) so concurrent callers never share state
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
     
-    # Create the grid for states and time steps
+    # Create the grid for states and time steps: every state is a circle,
+    # drawn in a single scatter call (step-major, like the rows of the trellis)
+    grid_t, grid_s = np.meshgrid(np.arange(n_obs), np.arange(n_states), indexing='ij')
+    grid_t, grid_s = grid_t.ravel(), grid_s.ravel()
+    face = np.tile(to_rgba('lightgrey', 0.3), (grid_t.shape[0], 1))
+    # Reconstructed path in Sumeru Green, differing pure path in blue (pure/original)
+    face[path[grid_t] == grid_s] = to_rgba('#2ecc71')
+    if pure_path is not None:
+        face[(pure_path[grid_t] == grid_s) & differs[grid_t]] = to_rgba('#3498db')
+    edge = np.zeros_like(face)
+    edge[:, 3] = face[:, 3]
+    # Circles shrink beyond 16 steps so long windows stay readable
+    ax.scatter(xs[grid_t], grid_s, c=face, s=500 * min(1.0, 16 / n_obs), edgecolors=edge, zorder=3)
+
     for t in range(n_obs):
-        for s in range(n_states):
-            # Plot each state as a circle
-            color = 'lightgrey'
-            alpha = 0.3
-            
-            # Check if this state is part of the reconstructed path
-            if best_path_indices[t] == s:
-                color = '#2ecc71' # Sumeru Green (reconstructed)
-                alpha = 1.0
-                plt.text(t, s + 0.3, states[s], ha='center', fontweight='bold', color='#27ae60')
-            
-            # Check if this state is part of the pure path (and differs from reconstructed)
-            if pure_path_indices and pure_path_indices[t] == s and pure_path_indices[t] != best_path_indices[t]:
-                color = '#3498db' # Blue (pure/original)
-                alpha = 1.0
-                plt.text(t, s - 0.3, states[s], ha='center', fontweight='bold', color='#2980b9')
-            
-            plt.scatter(t, s, color=color, s=500, edgecolors='black', alpha=alpha, zorder=3)
+        ax.text(xs[t], path[t] + 0.3, states[path[t]], ha='center', fontweight='bold', color='#27ae60')
+        if differs[t]:
+            ax.text(xs[t], pure_path[t] - 0.3, states[pure_path[t]], ha='center', fontweight='bold', color='#2980b9')
 
     # Draw the reconstructed path (The Viterbi Result)
-    for t in range(n_obs - 1):
-        plt.plot([t, t+1], [best_path_indices[t], best_path_indices[t+1]], 
-                 color='#27ae60', linewidth=3, zorder=2, label='Reconstructed' if t == 0 else '')
+    if n_obs > 1:
+        ax.plot(xs, path, color='#27ae60', linewidth=3, zorder=2, label='Reconstructed')
     
     # Draw the pure path if it differs
-    if pure_path_indices:
-        paths_differ = any(pure_path_indices[t] != best_path_indices[t] for t in range(n_obs))
-        if paths_differ:
-            for t in range(n_obs - 1):
-                plt.plot([t, t+1], [pure_path_indices[t], pure_path_indices[t+1]], 
-                         color='#3498db', linewidth=3, linestyle='--', zorder=2, 
-                         label='Original' if t == 0 else '')
+    if differs.any() and n_obs > 1:
+        ax.plot(xs, pure_path, color='#3498db', linewidth=3, linestyle='--', zorder=2, label='Original')
         
     # Formatting
-    plt.xticks(range(n_obs), [f"Obs: {char}" for char in obs_sequence])
-    plt.yticks(range(n_states), states)
+    xlabel = "Timeline of Withered Observations"
+    if offset is None:
+        ax.set_xticks(xs, [f"Obs: {char}" for char in obs_sequence])
+    else:
+        ax.set_xticks(xs, list(obs_sequence))
+        xlabel += f" (positions {xs[0]}-{xs[-1]})"
+    ax.set_yticks(range(n_states), states)
     title = "Project Irminsul: Viterbi Trellis Reconstruction"
-    if pure_path_indices and any(pure_path_indices[t] != best_path_indices[t] for t in range(n_obs)):
+    if differs.any():
         title += " (Original vs Reconstructed)"
-    plt.title(title, fontsize=14)
-    plt.xlabel("Timeline of Withered Observations")
-    plt.ylabel("Elemental State Space")
-    plt.grid(axis='x', linestyle='--', alpha=0.5)
-    if pure_path_indices and any(pure_path_indices[t] != best_path_indices[t] for t in range(n_obs)):
-        plt.legend(loc='upper right')
-    plt.tight_layout()
+    ax.set_title(title, fontsize=14)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Elemental State Space")
+    ax.grid(axis='x', linestyle='--', alpha=0.5)
+    if differs.any():
+        ax.legend(loc='upper right')
+    fig.tight_layout()
     
     if output_path:
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        plt.close()
+        fig.savefig(output_path, dpi=150, bbox_inches='tight')
         return None
     else:
         # Return the figure for use in interactive contexts (e.g., Gradio)
-        return plt.gcf()
\ No newline at end of file
+        return fig
\ No newline at end of file
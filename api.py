@@ -0,0 +1,252 @@
+"""
+Headless JSON/NDJSON batch API over all three phases (no Gradio, no plotting).
+
+Each input record is a JSON object with a "phase" and that phase's inputs:
+
+    {"phase": "irminsul", "withered": "DEWEPWHWG", "pure": "DEEEPAHHG"}
+    {"phase": "eleazar", "age": 18, "vision": true, "scenario": "Heavy"}
+    {"phase": "delusion", "age": 23, "vision": true, "efficiency": 0.65, "boss_hp": 500000}
+
+Results are streamed back as NDJSON in completion order, each tagged with the
+record's "index" (0-based position in the input) and its "id" if one was given.
+
+    python api.py run records.ndjson --jobs 4 > results.ndjson
+    python api.py run --phase delusion < subjects.json
+    python api.py serve --port 8000   # POST records to /batch (or /<phase>)
+"""
+import argparse
+import itertools
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PHASES = ("irminsul", "eleazar", "delusion")
+
+
+def decode_irminsul(record):
+    from Irminsul import trikarma_purification, encode_record, decode_codes, compare_records, STATE_TABLE
+
+    withered, invalid = encode_record(str(record["withered"]))
+    if not withered.size or invalid.size:
+        raise ValueError("withered must use only P, H, E, C, A, D, G or W "
+                         f"(got {f'invalid symbols at {invalid[:10].tolist()}' if invalid.size else 'an empty record'})")
+
+    _, path = trikarma_purification(withered, return_indices=True)
+    result = {"restored": decode_codes(path), "path": path.tolist()}
+
+    pure = str(record.get("pure") or "")
+    if pure:
+        pure, invalid = encode_record(pure, STATE_TABLE)
+        if invalid.size:
+            raise ValueError(f"pure must use only P, H, E, C, A, D or G (got invalid symbols at {invalid[:10].tolist()})")
+        if pure.shape != withered.shape:
+            raise ValueError("pure and withered records must have the same length")
+        accuracy, mismatches = compare_records(pure, path)
+        result["accuracy"] = accuracy
+        result["mismatches"] = mismatches.tolist()
+    return result
+
+
+def simulate_eleazar(record):
+    import numpy as np
+    from scipy.integrate import odeint
+    from Eleazar import eleazar_model, BASE_PARAMS, INITIAL_CONDITIONS
+
+    y0 = record.get("y0") or INITIAL_CONDITIONS[record.get("scenario", "Heavy")]
+    days = float(record.get("days", 120))
+    t = np.linspace(0, days, int(record.get("steps", 1200)))
+    params = record.get("params", BASE_PARAMS)
+    sol = odeint(eleazar_model, [float(v) for v in y0], t,
+                 args=(int(record["age"]), bool(record.get("vision", False)), params))
+
+    result = {
+        "final": {"V": float(sol[-1, 0]), "C": float(sol[-1, 1]), "S": float(sol[-1, 2])},
+        "min_vitality": float(sol[:, 0].min()),
+        # Critical Failure Threshold used by the Phase 2 plots
+        "failed": bool((sol[:, 0] < 15).any()),
+    }
+    if record.get("trajectory"):
+        from payloads import decimate
+        idx = decimate(t.shape[0], int(record.get("points", 121)))
+        result["trajectory"] = {
+            "day": t[idx].round(3).tolist(),
+            "V": sol[idx, 0].round(3).tolist(),
+            "C": sol[idx, 1].round(3).tolist(),
+            "S": sol[idx, 2].round(3).tolist(),
+        }
+    return result
+
+
+def audit_delusion(record):
+    from Delusion.delusion import activate_delusion
+    from instrumentation import span, count
+
+    with span("delusion.milp"):
+        cost = activate_delusion(
+            record.get("name", "Subject"),
+            int(record["age"]),
+            bool(record.get("vision", False)),
+            float(record["efficiency"]),
+            boss_hp=float(record.get("boss_hp", 500000)),
+            max_time=float(record.get("max_time", 90)),
+            silent=True,
+        )
+    count("delusion.milp.solves")
+    return {"survived": cost is not None, "cost": cost}
+
+
+RUNNERS = {
+    "irminsul": decode_irminsul,
+    "eleazar": simulate_eleazar,
+    "delusion": audit_delusion,
+}
+
+
+def run_record(index, record, default_phase=None):
+    """Runs one record and returns its result line (errors are reported, not raised)."""
+    out = {"index": index}
+    try:
+        if not isinstance(record, dict):
+            raise ValueError("each record must be a JSON object")
+        if "id" in record:
+            out["id"] = record["id"]
+        phase = record.get("phase", default_phase)
+        if phase not in RUNNERS:
+            raise ValueError(f"phase must be one of {', '.join(PHASES)}")
+        out["phase"] = phase
+        out["result"] = RUNNERS[phase](record)
+    except Exception as exc:
+        out["error"] = f"{type(exc).__name__}: {exc}"
+    return out
+
+
+def read_records(lines):
+    """
+    Parses a JSON array (whole input) or NDJSON (one object per line, read lazily).
+    Yields (index, record); unparsable NDJSON lines yield an error string instead.
+    """
+    lines = iter(lines)
+    for first in lines:
+        if first.strip():
+            break
+    else:
+        return
+
+    if first.lstrip().startswith("["):
+        for index, record in enumerate(json.loads(first + "".join(lines))):
+            yield index, record
+        return
+
+    index = 0
+    for line in itertools.chain([first], lines):
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield index, f"invalid JSON: {exc}"
+        index += 1
+
+
+def stream(records, jobs=1, default_phase=None):
+    """
+    Runs (index, record) pairs and yields result lines as they finish.
+    With jobs > 1 records run in a process pool, keeping at most 4 * jobs in
+    flight so arbitrarily long inputs stream with bounded memory.
+    """
+    if jobs <= 1:
+        for index, record in records:
+            yield _run_parsed(index, record, default_phase)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = set()
+        for index, record in records:
+            pending.add(pool.submit(_run_parsed, index, record, default_phase))
+            if len(pending) >= 4 * jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _run_parsed(index, record, default_phase):
+    if isinstance(record, str):
+        return {"index": index, "error": record}
+    return run_record(index, record, default_phase)
+
+
+class BatchHandler(BaseHTTPRequestHandler):
+    """POST /batch (records carry their own phase) or /<phase>; streams NDJSON back."""
+    protocol_version = "HTTP/1.1"
+    jobs = 1
+
+    def do_POST(self):
+        route = self.path.strip("/").split("?")[0]
+        if route != "batch" and route not in PHASES:
+            self.send_error(404, f"POST to /batch or one of /{', /'.join(PHASES)}")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("utf-8")
+        default_phase = None if route == "batch" else route
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for line in stream(read_records(body.splitlines(True)), self.jobs, default_phase):
+                self._chunk(json.dumps(line) + "\n")
+        except json.JSONDecodeError as exc:
+            self._chunk(json.dumps({"error": f"invalid JSON: {exc}"}) + "\n")
+        self._chunk("")
+
+    def _chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="read JSON/NDJSON records and write NDJSON results")
+    run.add_argument("input", nargs="?", help="input file (default: stdin)")
+    run.add_argument("--phase", choices=PHASES, help="phase for records without a 'phase' key")
+    run.add_argument("--jobs", type=int, default=1, help="worker processes (default: 1)")
+
+    serve = commands.add_parser("serve", help="serve the batch API over local HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--jobs", type=int, default=1, help="worker processes per request")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        source = open(args.input, encoding="utf-8") if args.input else sys.stdin
+        with source:
+            try:
+                for line in stream(read_records(source), args.jobs, args.phase):
+                    sys.stdout.write(json.dumps(line) + "\n")
+                    sys.stdout.flush()
+            except json.JSONDecodeError as exc:
+                sys.stdout.write(json.dumps({"error": f"invalid JSON: {exc}"}) + "\n")
+                sys.exit(1)
+    else:
+        BatchHandler.jobs = args.jobs
+        server = ThreadingHTTPServer((args.host, args.port), BatchHandler)
+        print(f"Serving batch API on http://{args.host}:{args.port}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
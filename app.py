@@ -1,7 +1,60 @@
+import os
+import sys
+import time
+
+_start = time.perf_counter()
+
+def _profile_imports():
+    """
+    Times every first-time absolute import the main thread makes while building
+    the app (imports on other threads, e.g. the warm-up, would interleave with
+    its self-time stack). Returns (timings, real_import): timings is a dict of
+    module -> (self seconds, cumulative seconds), filled until _report_imports.
+    """
+    import builtins
+    import threading
+    real_import = builtins.__import__
+    main_thread = threading.main_thread()
+    timings = {}
+    nested = []
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules or threading.current_thread() is not main_thread:
+            return real_import(name, globals, locals, fromlist, level)
+        begin = time.perf_counter()
+        nested.append(0.0)
+        try:
+            return real_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - begin
+            children = nested.pop()
+            if nested:
+                nested[-1] += elapsed
+            timings.setdefault(name, (elapsed - children, elapsed))
+
+    builtins.__import__ = timed_import
+    return timings, real_import
+
+def _report_imports(timings, real_import, limit=25):
+    import builtins
+    builtins.__import__ = real_import
+    print(f"{'self (ms)':>10} {'cumulative (ms)':>16}  module", file=sys.stderr)
+    ranked = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (own, cumulative) in ranked[:limit]:
+        print(f"{own * 1e3:10.1f} {cumulative * 1e3:16.1f}  {name}", file=sys.stderr)
+
+# TEYVAT_IMPORT_PROFILE=1 dumps per-module import cost and time-to-ready,
+# so startup regressions (a heavy module imported eagerly again) are visible
+_import_profile = _profile_imports() if os.environ.get("TEYVAT_IMPORT_PROFILE") else None
+
 import ui
 
 # Import demo for Gradio's reload mechanism to find it
 demo = ui.demo
 
+if _import_profile is not None:
+    _report_imports(*_import_profile)
+    print(f"App ready to launch after {time.perf_counter() - _start:.2f}s", file=sys.stderr)
+
 if __name__ == "__main__":
-    demo.launch(server_name="0.0.0.0", server_port=7860)
\ No newline at end of file
+    demo.launch(server_name="0.0.0.0", server_port=7860)
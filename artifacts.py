@@ -0,0 +1,261 @@
+import base64
+import functools
+import inspect
+import io
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from instrumentation import span, count, profiles_held
+
+# Most recent handler outputs kept for identical requests (warm-up entries are pinned)
+CACHE_SIZE = int(os.environ.get("TEYVAT_CACHE_SIZE", 32))
+# Seconds of background work the startup warm-up may spend before giving up
+WARMUP_BUDGET = float(os.environ.get("TEYVAT_WARMUP_BUDGET", 60))
+
+_cache = OrderedDict()
+_pinned = set()
+# Computations in progress, by key; identical requests wait on these futures
+_inflight = {}
+_lock = threading.Lock()
+# Result handed to followers when a streaming leader was closed before finishing
+_ABANDONED = object()
+
+
+def _normalize(value):
+    """Makes handler arguments hashable and insensitive to int/float slider noise."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), 6)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+def _freeze(output):
+    """
+    Serializes matplotlib figures once into Gradio's plot payload (image + metadata).
+    The frozen payload is immutable, so one artifact can be served to any number
+    of concurrent requests without re-rendering or re-encoding the figure.
+    """
+    if isinstance(output, tuple):
+        return tuple(_freeze(item) for item in output)
+    if type(output).__module__.startswith("matplotlib"):
+        from gradio.components.plot import PlotData
+        with span("artifacts.encode"):
+            return PlotData(type="matplotlib", plot=_encode_figure(output))
+    return output
+
+
+def _encode_figure(fig, fmt="webp"):
+    """Data URI of a figure, in the form gr.Plot sends for matplotlib plots."""
+    with io.BytesIO() as buffer:
+        fig.savefig(buffer, format=fmt)
+        data = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return f"data:image/{fmt};base64,{data}"
+
+
+def make_key(name, args):
+    return (name, _normalize(tuple(args)))
+
+
+def lookup(name, *args):
+    """Returns the cached outputs for (name, args), or None if not cached yet."""
+    key = make_key(name, args)
+    with _lock:
+        if key not in _cache:
+            return None
+        _cache.move_to_end(key)
+        return _cache[key]
+
+
+def store(name, args, outputs, pin=False):
+    key = make_key(name, args)
+    frozen = _freeze(outputs)
+    with _lock:
+        _cache[key] = frozen
+        _cache.move_to_end(key)
+        if pin:
+            _pinned.add(key)
+        evictable = [k for k in _cache if k not in _pinned]
+        for k in evictable[:max(0, len(_cache) - CACHE_SIZE)]:
+            del _cache[k]
+    return frozen
+
+
+def _final(outputs):
+    """Last partial output of a streaming handler (the outputs themselves otherwise)."""
+    if inspect.isgenerator(outputs):
+        return deque(outputs, maxlen=1)[0]
+    return outputs
+
+
+def _freeze_chunk(outputs, previous, frozen):
+    """
+    Freezes one partial output of a streaming handler. Items that are the very
+    object already streamed in the previous chunk reuse its frozen payload, so
+    a figure is encoded once however many chunks carry it.
+    """
+    if not isinstance(outputs, tuple) or not isinstance(previous, tuple):
+        return _freeze(outputs)
+    return tuple(done if new is old else _freeze(new) for new, old, done in zip(outputs, previous, frozen))
+
+
+def _unchanged(outputs, previous):
+    """
+    Replaces outputs that are the very object already streamed in the previous
+    chunk with a no-op update, so Gradio does not send an unchanged figure again.
+    """
+    if not isinstance(outputs, tuple) or not isinstance(previous, tuple):
+        return outputs
+    import gradio as gr
+    return tuple(gr.update() if new is old else new for new, old in zip(outputs, previous))
+
+
+def _claim(name, key):
+    """
+    Single-flight entry point for one request of a cached handler.
+    Returns ("hit", outputs) when cached, ("follow", future) when an identical
+    request is already computing, or ("lead", future) when this caller must
+    compute and then resolve the future for everyone waiting on it.
+    """
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            role, value = "hit", _cache[key]
+        elif key in _inflight:
+            role, value = "follow", _inflight[key]
+        else:
+            role, value = "lead", _inflight.setdefault(key, Future())
+    count({"hit": f"cache.{name}.hits", "follow": f"coalesce.{name}.merged", "lead": f"cache.{name}.misses"}[role])
+    return role, value
+
+
+def _release(key, future, outputs=None, error=None):
+    """Ends the in-flight computation of key; followers get outputs (or error)."""
+    # Outputs are stored before the key leaves _inflight, so a new identical
+    # request always finds either the cache entry or the computation
+    with _lock:
+        _inflight.pop(key, None)
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(outputs)
+
+
+def _lead(name, args, key, future, compute, pin=False):
+    try:
+        outputs = store(name, args, compute(), pin=pin)
+    except Exception as exc:
+        _release(key, future, error=exc)
+        raise
+    _release(key, future, outputs)
+    return outputs
+
+
+def cached(name):
+    """
+    Decorator: serve identical requests of a handler from the artifact cache.
+    Concurrent identical requests are coalesced: the first one computes, the
+    others wait for it and share its outputs (or its error).
+    Streaming (generator) handlers stream their partial outputs, each figure
+    encoded once, and end with the cached final outputs; a hit, or a request
+    that waited on an identical in-flight one, is answered in a single chunk.
+    """
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def stream(*args):
+                key = make_key(name, args)
+                while True:
+                    role, value = _claim(name, key)
+                    if role == "hit":
+                        yield value
+                        return
+                    if role == "follow":
+                        outputs = value.result()
+                        if outputs is _ABANDONED:
+                            # The leading request went away mid-stream; compute instead
+                            continue
+                        yield outputs
+                        return
+                    break
+
+                future, released = value, False
+                try:
+                    # Reads one chunk ahead: every chunk but the last streams
+                    # only what changed, and the last is cached and sent whole,
+                    # so clients reading only the last chunk get every view
+                    steps = fn(*args)
+                    previous = frozen = None
+                    outputs = next(steps)
+                    for upcoming in steps:
+                        chunk = _freeze_chunk(outputs, previous, frozen)
+                        yield _unchanged(chunk, frozen)
+                        previous, frozen = outputs, chunk
+                        outputs = upcoming
+                    final = store(name, args, _freeze_chunk(outputs, previous, frozen))
+                    _release(key, future, final)
+                    released = True
+                except Exception as exc:
+                    _release(key, future, error=exc)
+                    released = True
+                    raise
+                finally:
+                    # Reached without a result when the client goes away mid-stream
+                    if not released:
+                        _release(key, future, _ABANDONED)
+                yield final
+            stream.cache_name = name
+            return stream
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = make_key(name, args)
+            role, value = _claim(name, key)
+            if role == "hit":
+                return value
+            if role == "follow":
+                return value.result()
+            return _lead(name, args, key, value, lambda: fn(*args))
+        wrapper.cache_name = name
+        return wrapper
+    return decorator
+
+
+def warm_up(jobs, budget=WARMUP_BUDGET):
+    """
+    Precomputes the default views on a daemon thread so startup never waits on it.
+    jobs: list of (cached handler, args) pairs, run in order until budget seconds
+    have been spent; whatever is left is computed on first request as usual.
+    """
+    def run():
+        start = time.perf_counter()
+        done = 0
+        # TEYVAT_PROFILE captures are meant for user requests, not the defaults
+        with profiles_held():
+            for handler, args in jobs:
+                if time.perf_counter() - start > budget:
+                    break
+                name = handler.cache_name
+                key = make_key(name, args)
+                try:
+                    # Requests for a default view arriving mid warm-up wait for it
+                    role, value = _claim(name, key)
+                    if role == "lead":
+                        _lead(name, args, key, value, lambda: _final(handler.__wrapped__(*args)), pin=True)
+                    elif role == "follow" and value.result() is not _ABANDONED:
+                        store(name, args, value.result(), pin=True)
+                    done += 1
+                except Exception as exc:
+                    print(f"Warm-up of {name}{tuple(args)} failed: {exc}")
+        print(f"Warm-up cached {done}/{len(jobs)} default views in {time.perf_counter() - start:.1f}s")
+
+    thread = threading.Thread(target=run, name="teyvat-warm-up", daemon=True)
+    thread.start()
+    return thread
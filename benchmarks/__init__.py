@@ -0,0 +1 @@
+"""Performance benchmarks for the hot paths of all three phases."""
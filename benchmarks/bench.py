@@ -0,0 +1,254 @@
+"""
+Benchmark suite for the hot paths of all three phases.
+
+    python -m benchmarks.bench --save            # record benchmarks/baseline.json
+    python -m benchmarks.bench --compare         # fail if anything got >20% slower
+    python -m benchmarks.bench --compare --threshold 10 --filter delusion
+
+Each benchmark is run once to warm up, then `--repeat` times; the median is
+what gets saved and compared. Handler benchmarks are split into a compute
+and a render step (figure build + PNG encode, as Gradio does) and bypass the
+artifact cache and worker pool.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Headless rendering, and no tqdm progress bars interleaved with the timings
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Registers a zero-argument setup function returning the callable to time."""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def _encode(*figures):
+    for fig in figures:
+        with io.BytesIO() as buf:
+            fig.savefig(buf, format="png")
+
+
+# --- Phase 1: Irminsul ---
+
+def _viterbi(length):
+    def setup():
+        from Irminsul import trikarma_purification
+        obs = np.random.default_rng(length).integers(0, 8, length).tolist()
+        return lambda: trikarma_purification(obs, return_indices=True)
+    return setup
+
+for _length in (16, 256, 4096):
+    benchmark(f"irminsul.viterbi[{_length}]")(_viterbi(_length))
+
+
+@benchmark("irminsul.long_record[100000]")
+def _():
+    import handlers
+    rng = np.random.default_rng(0)
+    record = np.frombuffer(b"PHECADGW", dtype=np.uint8)[rng.integers(0, 8, 100000)].tobytes()
+    return lambda: handlers._decode_long_record(record)
+
+
+@benchmark("irminsul.handler.compute")
+def _():
+    import handlers
+    return lambda: handlers._decode_record("DEEEPAHHG", "DEWEPWHWG")
+
+
+@benchmark("irminsul.handler.render")
+def _():
+    import handlers
+    from Irminsul import ELEMENTS
+    from Irminsul.trellis import plot_viterbi_trellis
+    _, withered, path, pure = handlers._decode_record("DEEEPAHHG", "DEWEPWHWG")
+    return lambda: _encode(plot_viterbi_trellis(withered, ELEMENTS, path, pure_record=pure))
+
+
+# --- Phase 2: Eleazar ---
+
+def _cohort(size):
+    def setup():
+        from Eleazar import run_simulation
+        rng = np.random.default_rng(size)
+        scenarios = [
+            {"name": f"Subject {i}", "age": int(rng.integers(6, 90)), "vision": bool(rng.random() < 0.5)}
+            for i in range(size)
+        ]
+        return lambda: run_simulation(scenarios)
+    return setup
+
+for _size in (1, 10, 50):
+    benchmark(f"eleazar.run_simulation[{_size}]")(_cohort(_size))
+
+
+def _eleazar_compute():
+    # The handler's steps: the custom subject first, then the benchmark patients
+    import handlers
+    t, y0, scenarios = handlers._eleazar_setup("Traveler", 20, False, "Heavy")
+    results = handlers._solve_eleazar(t, y0, [sc for sc in scenarios if sc.get("custom")], {})
+    handlers._solve_eleazar(t, y0, [sc for sc in scenarios if not sc.get("custom")], results)
+    return t, y0, scenarios, results
+
+
+@benchmark("eleazar.handler.compute")
+def _():
+    return _eleazar_compute
+
+
+@benchmark("eleazar.handler.render")
+def _():
+    import handlers
+    t, y0, scenarios, results = _eleazar_compute()
+    return lambda: _encode(handlers._plot_eleazar(t, y0, scenarios, results, "Heavy"))
+
+
+# --- Phase 3: Delusion ---
+
+@benchmark("delusion.activate_delusion")
+def _():
+    from Delusion.delusion import activate_delusion
+    return lambda: activate_delusion("Childe", 23, True, 0.65, 500000, silent=True)
+
+
+def _ridge_grid(size=15, boss_hp=500000):
+    X, Y = np.meshgrid(np.linspace(0.05, 0.95, size), np.linspace(100000, int(boss_hp * 1.2), size))
+    return X, Y
+
+
+@benchmark("delusion.ridge.milp[15x15]")
+def _():
+    from Delusion.delusion import activate_delusion
+    X, Y = _ridge_grid()
+
+    def sweep():
+        for eff, hp in zip(X.ravel(), Y.ravel()):
+            activate_delusion("Subject", 25, eff > 0.6, eff, hp, silent=True)
+    return sweep
+
+
+@benchmark("delusion.ridge.batch_audit[15x15]")
+def _():
+    from Delusion.roster import make_roster, batch_audit
+    X, Y = _ridge_grid()
+    roster = make_roster(["Subject"] * X.size, np.full(X.size, 25), X.ravel() > 0.6, X.ravel())
+    return lambda: batch_audit(roster, boss_hp=Y.ravel())
+
+
+@benchmark("delusion.batch_audit[100000]")
+def _():
+    from Delusion.roster import make_roster, batch_audit
+    rng = np.random.default_rng(0)
+    n = 100000
+    roster = make_roster(["Subject"] * n, rng.integers(10, 70, n), rng.random(n) < 0.5, rng.uniform(0, 1, n))
+    return lambda: batch_audit(roster, boss_hp=500000)
+
+
+@benchmark("delusion.hp_sweep[20]")
+def _():
+    from Delusion.parametric import hp_sweep
+    hps = np.linspace(10000, 750000, 20)
+    return lambda: hp_sweep(23, True, 0.65, hps)
+
+
+@benchmark("delusion.handler.compute")
+def _():
+    import handlers
+    return lambda: (handlers._delusion_curves("Traveler", 25, False, 0.5, 500000.0),
+                    handlers._delusion_ridge(500000.0))
+
+
+@benchmark("delusion.handler.render")
+def _():
+    import handlers
+    curves = handlers._delusion_curves("Traveler", 25, False, 0.5, 500000.0)
+    X, Y, Z = handlers._delusion_ridge(500000.0)
+    return lambda: _encode(handlers._plot_delusion_2d("Traveler", 500000.0, curves),
+                           handlers._plot_delusion_3d(500000.0, X, Y, Z))
+
+
+def run(names, repeat):
+    results = {}
+    for name in names:
+        fn = BENCHMARKS[name]()
+        fn()  # warm-up: imports, caches, first-call overhead
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        results[name] = {"median": statistics.median(times), "min": min(times), "repeat": repeat}
+        print(f"{name:40s} median {results[name]['median'] * 1e3:10.2f} ms   min {results[name]['min'] * 1e3:10.2f} ms",
+              file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns the names of benchmarks whose median regressed by more than threshold percent."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median"], result["median"]
+        change = (after - before) / before * 100 if before > 0 else 0.0
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"{name:40s} {before * 1e3:10.2f} -> {after * 1e3:10.2f} ms  {change:+7.1f}%  {flag}", file=sys.stderr)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of all three phases.")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default: 5)")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="write results as a JSON baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="allowed slowdown in percent before --compare fails (default: 20)")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "processor": platform.processor(),
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved baseline to {args.save}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than {args.threshold:.0f}%: {', '.join(regressions)}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
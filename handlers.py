@@ -1,66 +1,86 @@
-import matplotlib.pyplot as plt
+import os
+# Headless rendering; set before anything (including Gradio) imports matplotlib
+os.environ.setdefault("MPLBACKEND", "Agg")
 import numpy as np
-from scipy.integrate import odeint
-from mpl_toolkits.mplot3d import Axes3D
 from Irminsul import trikarma_purification, ELEMENTS, OBS_MAP
-from Irminsul.trellis import plot_viterbi_trellis
-from Eleazar.eleazar import eleazar_model
-from Delusion.delusion import activate_delusion
+from Irminsul import encode_record, decode_codes, compare_records, OBSERVATIONS, OBS_TABLE, STATE_TABLE
+from Delusion.parametric import survival_curve
+from Delusion.roster import make_roster, derive_stats, batch_audit
+from Delusion.burst import subjects as benchmarks, roster as benchmark_roster
+from workers import pooled
+from artifacts import cached
+from instrumentation import span, count, request
+import payloads
+
+# "figure": matplotlib Figures rendered server-side (gr.Plot).
+# "data": compact tables drawn client-side by gr.LinePlot (see payloads.py).
+PLOT_MODE = os.environ.get("TEYVAT_PLOT_MODE", "figure")
+
+# Steps of a long Irminsul record shown per trellis window
+TRELLIS_WINDOW = 32
+# Restored symbols and mismatch positions quoted in the long-record summary
+RECORD_PREVIEW = 256
+MISMATCH_PREVIEW = 20
+
+# Grid sizes of the streamed 3D survival ridge: a coarse preview, then the full ridge
+RIDGE_RESOLUTIONS = (6, 15)
+
+# Every handler builds its own Figure objects (no pyplot state machine), so
+# concurrent requests never draw on each other's axes. Figures are not
+# registered with pyplot; they are freed once Gradio has serialized them.
+# Identical requests are answered from the artifact cache (see artifacts.py),
+# which holds the already-encoded images instead of live figures.
+# The Phase 2 and Phase 3 handlers are generators: each yield is a usable
+# partial view (cheapest part first), and only the last one is cached.
+#
+# Only numpy-level modules are imported at startup. matplotlib, mplot3d and
+# the scipy ODE stack are imported inside the functions that need them, so
+# the server binds before any of them load and each tab pays its own import
+# cost on first use.
 
 def get_benchmark_stats():
     """Calculate and return stats for the three benchmark subjects"""
-    benchmarks = [
-        {"name": "Childe", "age": 23, "vis": True, "eff": 0.65},
-        {"name": "Arlecchino", "age": 30, "vis": True, "eff": 0.95},
-        {"name": "Foolish NPC", "age": 16, "vis": False, "eff": 0.05}
-    ]
-    
+    stats = derive_stats(benchmark_roster)
+
     stats_text = "### Benchmark Subject Stats\n\n"
     stats_text += "| Subject | Age | Vision | Efficiency | ER | CD (s) | Q Cost | Budget |\n"
     stats_text += "|---------|-----|--------|------------|----|----|--------|--------|\n"
-    
-    for bench in benchmarks:
-        age = bench["age"]
-        has_vision = bench["vis"]
-        efficiency = bench["eff"]
-        
-        # Calculate stats using same logic as activate_delusion
-        cooldown = 12 - (5 * efficiency)
-        burst_req = 90 - (10 * efficiency)
-        base_energy = 10 + (17 * efficiency) + (8 * efficiency * efficiency) - 0.34 * age
-        energy_per_E = base_energy * (1.5 if has_vision else 1.0)
-        initial_R = np.exp(-0.012 * age)
-        budget = initial_R - 0.15
-        
-        vis_str = "Yes" if has_vision else "No"
-        stats_text += f"| {bench['name']} | {age} | {vis_str} | {efficiency:.2f} | {energy_per_E:.1f} | {cooldown:.1f} | {burst_req:.0f} | {budget:.3f} |\n"
-    
+
+    for bench, row in zip(benchmark_roster, stats):
+        vis_str = "Yes" if bench["vis"] else "No"
+        stats_text += f"| {bench['name']} | {bench['age']:.0f} | {vis_str} | {bench['eff']:.2f} | {row['energy_per_E']:.1f} | {row['cooldown']:.1f} | {row['burst_req']:.0f} | {row['budget']:.3f} |\n"
+
     return stats_text
 
-def reconstruct_irminsul(pure_input, withered_input):
+def _decode_record(pure_input, withered_input):
+    """
+    Compute half of reconstruct_irminsul.
+    Returns (output_text, withered_str, path_indices, pure_record_for_plot);
+    path_indices is None when the input could not be decoded.
+    """
     # 1. Validation & Truncation for pure sequence
     valid_elements = ELEMENTS
     clean_pure = "".join([c.upper() for c in pure_input if c.upper() in valid_elements])
     pure_str = clean_pure[:16]
-    
+
     # 2. Validation & Truncation for withered sequence
     valid_chars = ELEMENTS + ['W']
     clean_withered = "".join([c.upper() for c in withered_input if c.upper() in valid_chars])
     withered_str = clean_withered[:16]
-    
+
     if not withered_str:
-        return "Please enter valid Elemental symbols (P, H, E, C, A, D, G) or 'W' for Withering.", None
-    
+        return "Please enter valid Elemental symbols (P, H, E, C, A, D, G) or 'W' for Withering.", withered_str, None, None
+
     # 3. Convert withered string to observation indices
     try:
         withered_indices = [OBS_MAP[c] for c in withered_str]
     except KeyError:
-        return "Invalid character in withered input. Please use only P, H, E, C, A, D, G, or W.", None
+        return "Invalid character in withered input. Please use only P, H, E, C, A, D, G, or W.", withered_str, None, None
 
     # 4. Use actual Viterbi algorithm
     reconstructed, path_indices = trikarma_purification(withered_indices, return_indices=True)
     reconstructed_str = "".join(reconstructed)
-    
+
     # 5. Calculate accuracy if pure sequence is provided
     accuracy_info = ""
     pure_record_for_plot = None
@@ -72,207 +92,326 @@ def reconstruct_irminsul(pure_input, withered_input):
             else:
                 # Pad with empty or use what we have
                 pass
-        
+
         if len(pure_str) == len(reconstructed_str):
             mismatches = sum(1 for i in range(len(reconstructed_str)) if reconstructed_str[i] != pure_str[i])
             total = len(reconstructed_str)
             accuracy = ((total - mismatches) / total * 100) if total > 0 else 0
             accuracy_info = f"\nAccuracy: {accuracy:.1f}% ({total - mismatches}/{total} correct, {mismatches} mismatches)"
             pure_record_for_plot = pure_str
-    
-    # 6. Use the actual trellis plotting function
-    fig = plot_viterbi_trellis(withered_str, ELEMENTS, path_indices, output_path=None, pure_record=pure_record_for_plot)
-    
+
     output_text = reconstructed_str + accuracy_info
+    return output_text, withered_str, path_indices, pure_record_for_plot
+
+@cached("irminsul")
+@pooled
+@request("irminsul")
+def reconstruct_irminsul(pure_input, withered_input):
+    with span("irminsul.decode"):
+        output_text, withered_str, path_indices, pure_record = _decode_record(pure_input, withered_input)
+    if path_indices is None:
+        return output_text, None
+
+    if PLOT_MODE == "data":
+        return output_text, payloads.trellis_frame(ELEMENTS, path_indices, pure_record)
+
+    # 6. Use the actual trellis plotting function
+    from Irminsul.trellis import plot_viterbi_trellis
+    with span("irminsul.render"):
+        fig = plot_viterbi_trellis(withered_str, ELEMENTS, path_indices, output_path=None, pure_record=pure_record)
     return output_text, fig
 
-def simulate_triple_comparison(u_name, u_age, u_vision, initial_scenario):
-    """
-    Compare custom character against Collei and Dunyarzad using the actual Eleazar model.
-    Uses the real eleazar_model function from the Eleazar package.
-    """
-    # Initial condition scenarios
-    initial_conditions = {
-        "Heavy": [84.0, 20.0, 12.0],  # V_0, C_0, S_0
-        "Medium": [86.0, 12.0, 8.0],
-        "Light": [90.0, 5.0, 2.0]
-    }
-    
-    y0 = initial_conditions[initial_scenario]
-    
-    # Define benchmark scenarios
-    scenarios = [
+def _eleazar_scenarios(u_name, u_age, u_vision):
+    """Benchmark patients (Collei, Dunyarzad) followed by the custom subject."""
+    return [
         {"name": "Collei (Young, Dendro Vision)", "age": 18, "vision": True, "color": "#a6c938"},
         {"name": "Dunyarzad (Elderly, No Vision)", "age": 65, "vision": False, "color": "#ef7a35"},
-        {"name": f"{u_name} (Custom)", "age": int(u_age), "vision": bool(u_vision), "color": "#3498db"}
+        {"name": f"{u_name} (Custom)", "age": int(u_age), "vision": bool(u_vision), "color": "#3498db", "custom": True}
     ]
-    
-    # Base parameters from Eleazar solver
-    base_params = [0.12, 0.06, 0.22, 0.04, 0.08]  # [regen, drain, corruption_rate, scale_drag, ossification]
+
+def _read_record(source):
+    """Raw bytes of an uploaded record (file path or file object); b"" if none."""
+    if source is None:
+        return b""
+    with open(getattr(source, "name", source), "rb") as f:
+        return f.read()
+
+def _positions(positions):
+    shown = ", ".join(str(p) for p in positions[:MISMATCH_PREVIEW])
+    return shown + (", ..." if len(positions) > MISMATCH_PREVIEW else "")
+
+def _decode_long_record(withered_bytes, pure_bytes=b""):
+    """
+    Compute half of decode_long_record, on uint8 code arrays end to end.
+    Returns (summary_text, record); record is None when the input is invalid,
+    otherwise a dict of code arrays: withered, path and pure (or None).
+    """
+    withered, invalid = encode_record(withered_bytes, OBS_TABLE)
+    if not withered.size:
+        return "Please upload a record of Elemental symbols (P, H, E, C, A, D, G) or 'W' for Withering.", None
+    if invalid.size:
+        return (f"Invalid characters at {invalid.size:,} positions of the file (byte offsets {_positions(invalid)}). "
+                "Please use only P, H, E, C, A, D, G, or W."), None
+
+    pure = None
+    if pure_bytes:
+        pure, invalid = encode_record(pure_bytes, STATE_TABLE)
+        if invalid.size:
+            return (f"Invalid characters in the pure record at {invalid.size:,} positions of the file (byte offsets {_positions(invalid)}). "
+                    "Please use only P, H, E, C, A, D, or G."), None
+        if pure.shape != withered.shape:
+            return f"The pure record has {pure.size:,} symbols but the withered record has {withered.size:,}.", None
+
+    _, path = trikarma_purification(withered, return_indices=True)
+
+    n_withered = int(np.count_nonzero(withered == OBS_MAP['W']))
+    preview = decode_codes(path[:RECORD_PREVIEW])
+    summary = (f"Decoded {withered.size:,} symbols ({n_withered:,} withered, {n_withered / withered.size:.1%}).\n"
+               f"Restored: {preview}{'...' if path.size > RECORD_PREVIEW else ''}")
+    if pure is not None:
+        accuracy, mismatches = compare_records(pure, path)
+        summary += (f"\nAccuracy: {accuracy * 100:.1f}% ({withered.size - mismatches.size:,}/{withered.size:,} correct, "
+                    f"{mismatches.size:,} mismatches)")
+        if mismatches.size:
+            summary += f"\nMismatch positions: {_positions(mismatches)}"
+    return summary, {"withered": withered, "path": path, "pure": pure}
+
+@pooled
+@request("irminsul_long")
+def decode_long_record(withered_file, pure_file=None):
+    """
+    Long-record path of Phase 1: decodes an uploaded record of any length
+    (no 16-character cap). Returns (summary_text, record) for trellis_window.
+    """
+    with span("irminsul.read"):
+        withered_bytes, pure_bytes = _read_record(withered_file), _read_record(pure_file)
+    with span("irminsul.decode"):
+        return _decode_long_record(withered_bytes, pure_bytes)
+
+@pooled
+def trellis_window(record, start, size=TRELLIS_WINDOW):
+    """Trellis of size steps of a decoded long record, starting at position start."""
+    if record is None:
+        return None
+    n_obs = record["path"].shape[0]
+    # Starts past the end show the last window rather than a 1-step trellis
+    start = min(max(0, int(start)), max(0, (n_obs - 1) // size * size))
+    stop = min(n_obs, start + size)
+
+    path = record["path"][start:stop]
+    pure = None if record["pure"] is None else decode_codes(record["pure"][start:stop])
+    if PLOT_MODE == "data":
+        return payloads.trellis_frame(ELEMENTS, path, pure, offset=start)
+
+    from Irminsul.trellis import plot_viterbi_trellis
+    obs = decode_codes(record["withered"][start:stop], OBSERVATIONS)
+    with span("irminsul.render"):
+        return plot_viterbi_trellis(obs, ELEMENTS, path, output_path=None, pure_record=pure, offset=start)
+
+def _eleazar_setup(u_name, u_age, u_vision, initial_scenario):
+    """Returns (t, y0, scenarios) shared by every step of simulate_triple_comparison."""
+    from Eleazar import INITIAL_CONDITIONS
+
+    # Initial condition scenarios (V_0, C_0, S_0)
+    y0 = INITIAL_CONDITIONS[initial_scenario]
+    scenarios = _eleazar_scenarios(u_name, u_age, u_vision)
     t = np.linspace(0, 120, 1200)
-    
+    return t, y0, scenarios
+
+def _solve_eleazar(t, y0, scenarios, results):
+    """Adds one odeint solution per scenario to results (keyed by scenario name)."""
+    from scipy.integrate import odeint
+    from Eleazar import eleazar_model, BASE_PARAMS
+
+    # Base parameters from Eleazar solver
+    base_params = BASE_PARAMS  # [regen, drain, corruption_rate, scale_drag, ossification]
+
     # Run simulation for each scenario using actual Eleazar model
-    results = {}
     for sc in scenarios:
-        sol = odeint(eleazar_model, y0, t, args=(sc['age'], sc['vision'], base_params))
+        with span("eleazar.odeint"):
+            sol, info = odeint(eleazar_model, y0, t, args=(sc['age'], sc['vision'], base_params), full_output=True)
+        count("eleazar.odeint.solves")
+        count("eleazar.odeint.nfev", int(info["nfe"][-1]))
         results[sc['name']] = sol
-    
-    # Create visualization
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
-    
+    return results
+
+def _plot_eleazar(t, y0, scenarios, results, initial_scenario):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 8))
+    ax1, ax2 = fig.subplots(2, 1, sharex=True)
+
     for sc in scenarios:
         data = results[sc['name']]
         ax1.plot(t, data[:, 0], label=f"{sc['name']} - Vitality", color=sc['color'], linewidth=2)
         ax2.plot(t, data[:, 2], label=f"{sc['name']} - Scales", color=sc['color'], linewidth=2)
         # Also show corruption for custom character
-        if sc['name'] == f"{u_name} (Custom)":
+        if sc.get('custom'):
             ax1.plot(t, data[:, 1], label=f"{sc['name']} - Corruption", color=sc['color'], linestyle="--", alpha=0.6)
-    
+
     # Aesthetics
     ax1.set_ylabel("Vitality (%)")
     ax1.set_title(f"Eleazar: Vitality Dynamics (Gavrilov Reliability) - Comparison\nInitial: {initial_scenario} (V={y0[0]:.1f}%, C={y0[1]:.1f}%, S={y0[2]:.1f}%)")
     ax1.axhline(15, color='black', linestyle=':', label="Critical Failure Threshold", alpha=0.5)
     ax1.legend()
     ax1.grid(alpha=0.3)
-    
+
     ax2.set_ylabel("Petrification (Scales %)")
     ax2.set_xlabel("Days Since Exposure")
     ax2.set_title("Eleazar Physical Progression")
     ax2.legend()
     ax2.grid(alpha=0.3)
-    
-    plt.tight_layout()
+
+    fig.tight_layout()
     return fig
 
-def generate_phase3_plots(name, age, has_vision, efficiency, boss_hp):
+@cached("eleazar")
+@pooled
+@request("eleazar")
+def simulate_triple_comparison(u_name, u_age, u_vision, initial_scenario):
     """
-    Generate 2D comparison plot and 3D survival ridge for Phase 3: Delusion Toxicity
+    Compare custom character against Collei and Dunyarzad using the actual Eleazar model.
+    Uses the real eleazar_model function from the Eleazar package.
+    Streams the custom subject's curve first, then the full comparison.
+    """
+    t, y0, scenarios = _eleazar_setup(u_name, u_age, u_vision, initial_scenario)
+
+    custom = [sc for sc in scenarios if sc.get('custom')]
+    results = _solve_eleazar(t, y0, custom, {})
+    yield _eleazar_view(t, y0, custom, results, initial_scenario)
+
+    _solve_eleazar(t, y0, [sc for sc in scenarios if not sc.get('custom')], results)
+    yield _eleazar_view(t, y0, scenarios, results, initial_scenario)
+
+def _eleazar_view(t, y0, scenarios, results, initial_scenario):
+    if PLOT_MODE == "data":
+        return payloads.eleazar_frame(t, scenarios, results)
+    with span("eleazar.render"):
+        return _plot_eleazar(t, y0, scenarios, results, initial_scenario)
+
+def _delusion_curves(name, age, has_vision, efficiency, boss_hp):
+    """
+    Cost-vs-HP lines for the benchmarks (Childe, Arlecchino, and NPC) and the custom subject.
+    Returns a list of (subject, hps, costs, budget).
     """
-    age = int(age)
-    efficiency = float(efficiency)
-    boss_hp = float(boss_hp)
-    
-    # --- 1. Generate 2D Comparison Plot ---
-    fig2d, ax2d = plt.subplots(figsize=(10, 6))
     hp_range = np.linspace(10000, boss_hp * 1.5, 20)
-    
-    # Benchmark subjects: Childe, Arlecchino, and NPC
-    benchmarks = [
-        {"name": "Childe", "age": 23, "vis": True, "eff": 0.65, "color": "#e67e22"},
-        {"name": "Arlecchino", "age": 30, "vis": True, "eff": 0.95, "color": "#c0392b"},
-        {"name": "Foolish NPC", "age": 16, "vis": False, "eff": 0.05, "color": "#7f8c8d"}
-    ]
-    
-    # Plot benchmarks
-    for bench in benchmarks:
-        costs = []
-        hps = []
-        budget = np.exp(-0.012 * bench["age"]) - 0.15
-        
-        for hp in hp_range:
-            cost = activate_delusion(bench["name"], bench["age"], bench["vis"], bench["eff"], hp, silent=True)
-            if cost and cost <= budget:
-                costs.append(cost)
-                hps.append(hp)
-            else:
-                break
-        
+
+    subjects = [dict(bench) for bench in benchmarks]
+    subjects.append({"name": name, "age": age, "vis": has_vision, "eff": efficiency, "color": "#3498db"})
+
+    curves = []
+    for sub in subjects:
+        budget = np.exp(-0.012 * sub["age"]) - 0.15
+        # One parametric model per subject covers the whole HP range
+        with span("delusion.survival_curve"):
+            hps, costs = survival_curve(sub["age"], sub["vis"], sub["eff"], hp_range)
+        hps, costs = list(hps), list(costs)
+
         # Ensure line is visible even if they die instantly
         if len(hps) == 0:
             hps.append(0)
             costs.append(0)
             hps.append(hp_range[0])
             costs.append(budget)
-        
-        if len(hps) > 0:
-            ax2d.plot(hps, costs, label=f"{bench['name']} (Budget: {budget:.2f})", 
-                     color=bench["color"], marker='o', linewidth=2)
-            # Mark death point with skull
-            ax2d.scatter(hps[-1], costs[-1], marker='$\u2620$', color='black', s=250, zorder=5)
-    
-    # Plot custom subject
-    costs = []
-    hps = []
-    budget = np.exp(-0.012 * age) - 0.15
-    
-    for hp in hp_range:
-        cost = activate_delusion(name, age, has_vision, efficiency, hp, silent=True)
-        if cost and cost <= budget:
-            costs.append(cost)
-            hps.append(hp)
-        else:
-            break
-    
-    # Ensure line is visible even if they die instantly
-    if len(hps) == 0:
-        hps.append(0)
-        costs.append(0)
-        hps.append(hp_range[0])
-        costs.append(budget)
-    
-    ax2d.plot(hps, costs, label=f"{name} (Budget: {budget:.2f})", 
-             color="#3498db", marker='o', linewidth=2)
-    
-    if len(hps) > 0:
-        ax2d.scatter(hps[-1], costs[-1], marker='$\u2620$', color='black', s=250, zorder=5)
-    
-    ax2d.axhline(y=0.15, color='red', linestyle='--', alpha=0.5, label="Critical Instability (15%)")
-    ax2d.axhline(y=0, color='red', linestyle='--', alpha=0.5, label="Baseline (0%)")
-    ax2d.set_title(f"Forensic Damage Scaling for {name}")
-    
-    # Use appropriate scaling for HP values
+
+        curves.append((sub, hps, costs, budget))
+    return curves
+
+def _delusion_ridge(boss_hp, resolution=15):
+    """Survival ridge grid (X: efficiency, Y: boss HP, Z: remaining redundancy)."""
+    efficiencies = np.linspace(0.05, 0.95, resolution)
+    hps_3d = np.linspace(100000, int(boss_hp * 1.2), resolution)
+    X, Y = np.meshgrid(efficiencies, hps_3d)
+
+    # Whole ridge in one vectorized audit of a 25-year-old, Vision above η=0.6
+    ridge = make_roster(["Subject"] * X.size, np.full(X.size, 25), X.ravel() > 0.6, X.ravel())
+    with span("delusion.ridge"):
+        audit = batch_audit(ridge, boss_hp=Y.ravel())
+    count("delusion.ridge.audits", X.size)
+    initial_R = np.exp(-0.012 * 25)
+    remaining = np.where(audit["feasible"], initial_R - audit["cost"], 0.15)
+    Z = np.maximum(0.15, remaining).reshape(X.shape)
+    return X, Y, Z
+
+def _format_hp_axis(axis, boss_hp, set_label, label):
+    """Use appropriate scaling for HP values"""
+    from matplotlib.ticker import FuncFormatter
+
     if boss_hp >= 1000000:
         # Scale to millions
-        ax2d.set_xlabel("Total Damage Required (Boss HP, millions)")
-        ax2d.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
+        set_label(f"{label}, millions)")
+        axis.set_major_formatter(FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
     elif boss_hp >= 1000:
         # Scale to thousands
-        ax2d.set_xlabel("Total Damage Required (Boss HP, thousands)")
-        ax2d.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e3:.0f}K'))
+        set_label(f"{label}, thousands)")
+        axis.set_major_formatter(FuncFormatter(lambda x, p: f'{x/1e3:.0f}K'))
     else:
-        ax2d.set_xlabel("Total Damage Required (Boss HP)")
-    
+        set_label(f"{label})")
+
+def _plot_delusion_2d(name, boss_hp, curves):
+    from matplotlib.figure import Figure
+
+    fig2d = Figure(figsize=(10, 6))
+    ax2d = fig2d.subplots()
+
+    for sub, hps, costs, budget in curves:
+        ax2d.plot(hps, costs, label=f"{sub['name']} (Budget: {budget:.2f})",
+                 color=sub["color"], marker='o', linewidth=2)
+        # Mark death point with skull
+        ax2d.scatter(hps[-1], costs[-1], marker='$\u2620$', color='black', s=250, zorder=5)
+
+    ax2d.axhline(y=0.15, color='red', linestyle='--', alpha=0.5, label="Critical Instability (15%)")
+    ax2d.axhline(y=0, color='red', linestyle='--', alpha=0.5, label="Baseline (0%)")
+    ax2d.set_title(f"Forensic Damage Scaling for {name}")
+    _format_hp_axis(ax2d.xaxis, boss_hp, ax2d.set_xlabel, "Total Damage Required (Boss HP")
     ax2d.set_ylabel("Gavrilov Redundancy Cost (R-Loss)")
     ax2d.set_ylim(bottom=-0.1, top=1.1)
     ax2d.legend()
     ax2d.grid(True, which="both", ls="-", alpha=0.2)
-    
-    # --- 2. Generate 3D Survival Ridge ---
-    fig3d = plt.figure(figsize=(10, 7))
+    return fig2d
+
+def _plot_delusion_3d(boss_hp, X, Y, Z):
+    from matplotlib.figure import Figure
+    from mpl_toolkits.mplot3d import Axes3D  # registers the '3d' projection
+
+    fig3d = Figure(figsize=(10, 7))
     ax3d = fig3d.add_subplot(111, projection='3d')
-    
-    efficiencies = np.linspace(0.05, 0.95, 15)
-    hps_3d = np.linspace(100000, int(boss_hp * 1.2), 15)
-    X, Y = np.meshgrid(efficiencies, hps_3d)
-    Z = np.zeros(X.shape)
-    
-    for i in range(len(hps_3d)):
-        for j in range(len(efficiencies)):
-            has_vis = X[i, j] > 0.6
-            result_cost = activate_delusion("Subject", age=25, has_vision=has_vis, 
-                                          efficiency=X[i, j], boss_hp=Y[i, j], silent=True)
-            initial_R = np.exp(-0.012 * 25)
-            if result_cost is not None:
-                remaining = initial_R - result_cost
-                Z[i, j] = max(0.15, remaining)
-            else:
-                Z[i, j] = 0.15
-    
+
     surf = ax3d.plot_surface(X, Y, Z, cmap='inferno', edgecolor='none', alpha=0.9)
     ax3d.set_title("Delusions: The 3D Survival Ridge", fontsize=14)
     ax3d.set_xlabel("Mastery Efficiency (η)")
-    
-    # Use appropriate scaling for HP values in 3D plot
-    if boss_hp >= 1000000:
-        ax3d.set_ylabel("Combat Load (Boss HP, millions)")
-        ax3d.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
-    elif boss_hp >= 1000:
-        ax3d.set_ylabel("Combat Load (Boss HP, thousands)")
-        ax3d.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e3:.0f}K'))
-    else:
-        ax3d.set_ylabel("Combat Load (Boss HP)")
-    
+    _format_hp_axis(ax3d.yaxis, boss_hp, ax3d.set_ylabel, "Combat Load (Boss HP")
     ax3d.set_zlabel("Biological Redundancy (R)")
     fig3d.colorbar(surf, ax=ax3d, shrink=0.5, aspect=5, label='Survival Probability')
-    
-    return fig2d, fig3d
+    return fig3d
+
+@cached("delusion")
+@pooled
+@request("delusion")
+def generate_phase3_plots(name, age, has_vision, efficiency, boss_hp):
+    """
+    Generate 2D comparison plot and 3D survival ridge for Phase 3: Delusion Toxicity.
+    Streams the 2D plot first, then a coarse ridge, then the full-resolution ridge.
+    """
+    age = int(age)
+    efficiency = float(efficiency)
+    boss_hp = float(boss_hp)
+
+    # --- 1. Generate 2D Comparison Plot ---
+    curves = _delusion_curves(name, age, has_vision, efficiency, boss_hp)
+    if PLOT_MODE == "data":
+        view2d = payloads.delusion_curves_frame(curves)
+    else:
+        with span("delusion.render_2d"):
+            view2d = _plot_delusion_2d(name, boss_hp, curves)
+    yield view2d, None
+
+    # --- 2. Generate 3D Survival Ridge (coarse preview, then refined in place) ---
+    for resolution in RIDGE_RESOLUTIONS:
+        X, Y, Z = _delusion_ridge(boss_hp, resolution)
+        if PLOT_MODE == "data":
+            view3d = payloads.ridge_frame(X, Y, Z)
+        else:
+            with span("delusion.render_3d"):
+                view3d = _plot_delusion_3d(boss_hp, X, Y, Z)
+        yield view2d, view3d
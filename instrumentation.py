@@ -0,0 +1,262 @@
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# TEYVAT_METRICS=1 turns on spans and counters. When it is off, span() hands
+# back one shared no-op context manager and count() returns immediately, so
+# the instrumented hot paths pay a single flag check.
+ENABLED = os.environ.get("TEYVAT_METRICS", "") not in ("", "0")
+# Seconds between "metrics:" log lines (0 disables the log line)
+INTERVAL = float(os.environ.get("TEYVAT_METRICS_INTERVAL", 60))
+# Local port for GET /metrics (unset: no endpoint)
+PORT = os.environ.get("TEYVAT_METRICS_PORT")
+# Recent durations kept per span for the percentiles
+SAMPLES = 2048
+# Comma-separated handler names whose next request is captured with cProfile
+PROFILE = {name.strip() for name in os.environ.get("TEYVAT_PROFILE", "").split(",") if name.strip()}
+PROFILE_DIR = os.environ.get("TEYVAT_PROFILE_DIR", ".")
+
+_samples = {}
+_totals = {}
+_counters = {}
+_profile_armed = set(PROFILE)
+# Captures set aside by profiles_held() (None when nothing is held)
+_profile_held = None
+_lock = threading.Lock()
+_NULL = nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+
+
+def span(name):
+    """Context manager timing the enclosed block under name (no-op when disabled)."""
+    return _Span(name) if ENABLED else _NULL
+
+
+def record(name, seconds):
+    if not ENABLED:
+        return
+    with _lock:
+        if name not in _samples:
+            _samples[name] = deque(maxlen=SAMPLES)
+            _totals[name] = [0, 0.0]
+        _samples[name].append(seconds)
+        totals = _totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+
+
+def count(name, n=1):
+    """Adds n to the counter name (e.g. MILP solves, ODE right-hand-side evaluations)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def profile_next(name):
+    """Captures the next request of handler name with cProfile."""
+    with _lock:
+        (_profile_armed if _profile_held is None else _profile_held).add(name)
+
+
+@contextmanager
+def profiles_held():
+    """
+    Holds every armed cProfile capture while the block runs (the startup
+    warm-up), so the captures go to the first real requests after it.
+    """
+    global _profile_held
+    with _lock:
+        _profile_held = set(_profile_armed)
+        _profile_armed.clear()
+    try:
+        yield
+    finally:
+        with _lock:
+            _profile_armed.update(_profile_held)
+            _profile_held = None
+
+
+def request(name):
+    """
+    Decorator for handlers: the call is the "handler.<name>" span, and if a
+    cProfile capture is armed for name it runs under the profiler. The stats
+    are written to PROFILE_DIR/profile-<name>-<time>.prof and summarized on stderr.
+    Generator handlers also report "handler.<name>.first", the time to their
+    first partial output, and are profiled step by step.
+    """
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def stream(*args, **kwargs):
+                profiler = None
+                if name in _profile_armed:
+                    with _lock:
+                        if name in _profile_armed:
+                            _profile_armed.discard(name)
+                            profiler = cProfile.Profile()
+                start = time.perf_counter()
+                steps = fn(*args, **kwargs)
+                first = True
+                try:
+                    while True:
+                        # Steps may resume on different pool threads; cProfile
+                        # follows the current thread, so enable it per step
+                        if profiler:
+                            profiler.enable()
+                        try:
+                            item = next(steps)
+                        except StopIteration:
+                            return
+                        finally:
+                            if profiler:
+                                profiler.disable()
+                        if first:
+                            record(f"handler.{name}.first", time.perf_counter() - start)
+                            first = False
+                        yield item
+                finally:
+                    record(f"handler.{name}", time.perf_counter() - start)
+                    if profiler:
+                        _dump_profile(name, args, profiler)
+            return stream
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if name in _profile_armed:
+                with _lock:
+                    armed = name in _profile_armed
+                    _profile_armed.discard(name)
+                if armed:
+                    return _profiled(name, fn, *args, **kwargs)
+            with span(f"handler.{name}"):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _profiled(name, fn, *args, **kwargs):
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        record(f"handler.{name}", time.perf_counter() - start)
+        _dump_profile(name, args, profiler)
+
+
+def _dump_profile(name, args, profiler):
+    path = os.path.join(PROFILE_DIR, f"profile-{name}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+    profiler.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+    print(f"cProfile of {name}{args} saved to {path}\n{summary.getvalue()}", file=sys.stderr)
+
+
+def snapshot():
+    """Span percentiles (milliseconds, over the last SAMPLES calls) and counters."""
+    with _lock:
+        samples = {name: np.array(values) for name, values in _samples.items()}
+        totals = {name: tuple(values) for name, values in _totals.items()}
+        counters = dict(_counters)
+
+    spans = {}
+    for name, values in sorted(samples.items()):
+        p50, p90, p99 = np.percentile(values, [50, 90, 99]) * 1e3
+        spans[name] = {
+            "count": totals[name][0],
+            "total_s": round(totals[name][1], 3),
+            "p50_ms": round(p50, 2),
+            "p90_ms": round(p90, 2),
+            "p99_ms": round(p99, 2),
+            "max_ms": round(values.max() * 1e3, 2),
+        }
+    return {"spans": spans, "counters": dict(sorted(counters.items()))}
+
+
+def report():
+    """One line per span and counter, as printed by the periodic log line."""
+    data = snapshot()
+    lines = [
+        f"  {name:28s} n={s['count']:<6d} p50={s['p50_ms']:.1f}ms p90={s['p90_ms']:.1f}ms "
+        f"p99={s['p99_ms']:.1f}ms max={s['max_ms']:.1f}ms"
+        for name, s in data["spans"].items()
+    ]
+    lines += [f"  {name:28s} {value}" for name, value in data["counters"].items()]
+    return "\n".join(lines)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics (JSON, or ?format=text); POST /profile/<handler> arms a cProfile capture."""
+
+    def do_GET(self):
+        route, _, query = self.path.partition("?")
+        if route.rstrip("/") != "/metrics":
+            self.send_error(404, "GET /metrics")
+            return
+        if "format=text" in query:
+            self._reply(report() + "\n", "text/plain")
+        else:
+            self._reply(json.dumps(snapshot()), "application/json")
+
+    def do_POST(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "profile":
+            self.send_error(404, "POST /profile/<handler>")
+            return
+        profile_next(parts[1])
+        self._reply(json.dumps({"armed": parts[1]}), "application/json")
+
+    def _reply(self, text, content_type):
+        data = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(interval=INTERVAL, port=PORT):
+    """Starts the periodic log line and the local metrics endpoint (only when enabled)."""
+    if not ENABLED:
+        return
+    if interval > 0:
+        def log():
+            while True:
+                time.sleep(interval)
+                lines = report()
+                if lines:
+                    print(f"metrics:\n{lines}", file=sys.stderr)
+        threading.Thread(target=log, name="teyvat-metrics-log", daemon=True).start()
+    if port:
+        server = ThreadingHTTPServer(("127.0.0.1", int(port)), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="teyvat-metrics", daemon=True).start()
+        print(f"Metrics on http://127.0.0.1:{port}/metrics", file=sys.stderr)
@@ -0,0 +1,90 @@
+import numpy as np
+
+# Data-first responses: instead of a server-rendered matplotlib Figure, each
+# handler can return a compact long-form table that Gradio's native LinePlot
+# draws in the browser. Long series are decimated and values are rounded to
+# the precision the plots can show, which is what keeps the JSON small
+# (a float32 widened back to a Python float prints ~17 digits).
+
+# Points kept per Eleazar trajectory: one per day instead of the 1200-step ODE grid
+TRAJECTORY_POINTS = 121
+
+
+def decimate(n, points=TRAJECTORY_POINTS):
+    """Evenly spaced indices into a series of length n, always keeping both ends."""
+    return np.unique(np.linspace(0, n - 1, min(n, points)).round().astype(int))
+
+
+def _round(values, decimals):
+    return np.round(np.asarray(values, dtype=np.float64), decimals)
+
+
+def _frame(columns):
+    import pandas as pd
+    return pd.DataFrame(columns)
+
+
+def _concat(frames):
+    import pandas as pd
+    return pd.concat(frames, ignore_index=True)
+
+
+def trellis_frame(states, path_indices, pure_record=None, offset=0):
+    """
+    Viterbi path (and the original record where it differs) as state indices per step.
+    offset is the position of the first step in a longer record (windowed view).
+    Columns: step, state (index into states), path.
+    """
+    path_indices = np.asarray(path_indices, dtype=np.int8)
+    steps = np.arange(offset, offset + path_indices.shape[0], dtype=np.int64)
+    frames = [_frame({"step": steps, "state": path_indices, "path": "Reconstructed"})]
+
+    if pure_record and len(pure_record) == path_indices.shape[0]:
+        pure_indices = np.array([states.index(c) for c in pure_record], dtype=np.int8)
+        if (pure_indices != path_indices).any():
+            frames.append(_frame({"step": steps, "state": pure_indices, "path": "Original"}))
+    return _concat(frames)
+
+
+def eleazar_frame(t, scenarios, results, points=TRAJECTORY_POINTS):
+    """
+    Decimated Vitality/Scales trajectories (plus Corruption for the custom subject).
+    Columns: day, percent, series.
+    """
+    idx = decimate(t.shape[0], points)
+    day = _round(t[idx], 1)
+    frames = []
+    for sc in scenarios:
+        data = _round(results[sc['name']][idx], 2)
+        frames.append(_frame({"day": day, "percent": data[:, 0], "series": f"{sc['name']} - Vitality"}))
+        frames.append(_frame({"day": day, "percent": data[:, 2], "series": f"{sc['name']} - Scales"}))
+        if sc.get('custom'):
+            frames.append(_frame({"day": day, "percent": data[:, 1], "series": f"{sc['name']} - Corruption"}))
+    return _concat(frames)
+
+
+def delusion_curves_frame(curves):
+    """
+    Cost-vs-HP lines from handlers._delusion_curves.
+    Columns: hp, cost, subject.
+    """
+    frames = []
+    for sub, hps, costs, budget in curves:
+        frames.append(_frame({
+            "hp": _round(hps, 0),
+            "cost": _round(costs, 4),
+            "subject": f"{sub['name']} (Budget: {budget:.2f})",
+        }))
+    return _concat(frames)
+
+
+def ridge_frame(X, Y, Z):
+    """
+    Survival ridge as one line per efficiency (remaining R vs HP).
+    Columns: hp, R, efficiency.
+    """
+    Y, Z = _round(Y, 0), _round(Z, 4)
+    frames = []
+    for j in range(X.shape[1]):
+        frames.append(_frame({"hp": Y[:, j], "R": Z[:, j], "efficiency": f"η={X[0, j]:.2f}"}))
+    return _concat(frames)
@@ -0,0 +1,340 @@
+"""
+Cross-phase cohort pipeline: Irminsul -> Eleazar -> Delusion, per subject.
+
+Each subject's withered record is decoded (Phase 1); its withering fraction
+sets the Eleazar exposure y0 (Phase 2); the Vitality left after the course of
+Eleazar scales the subject's Delusion budget, audited with batch_audit (Phase 3).
+
+    {"id": "s1", "age": 23, "vision": true, "efficiency": 0.65, "withered": "DEWEPWHWG..."}
+
+Stages run in separate worker processes joined by bounded queues, so a slow
+stage backpressures the ones before it instead of buffering the cohort.
+Results stream out as NDJSON (completion order, tagged with "index");
+per-stage throughput is reported on stderr.
+
+    python pipeline.py cohort.ndjson > results.ndjson
+    python pipeline.py --synthetic 100000 --decode-workers 4 --eleazar-workers 4 > results.ndjson
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from api import read_records
+
+# Fully withered zones emit W with probability 0.30 (EMISSION_MATRIX), so a
+# record with that share of W is treated as Heavy exposure, and none as Light
+HEAVY_WITHERING = 0.30
+# Days simulated per subject and ODE steps (as in Phase 2)
+DAYS = 120
+STEPS = 1200
+# Critical Failure Threshold used by the Phase 2 plots
+CRITICAL_VITALITY = 15.0
+
+STAGES = ("irminsul", "eleazar", "delusion")
+
+
+def exposure_y0(withering_fraction):
+    """Eleazar initial conditions (V, C, S) interpolated from Light to Heavy by withering fraction."""
+    from Eleazar import INITIAL_CONDITIONS
+
+    level = np.clip(np.asarray(withering_fraction, dtype=float) / HEAVY_WITHERING, 0.0, 1.0)
+    light = np.array(INITIAL_CONDITIONS["Light"])
+    heavy = np.array(INITIAL_CONDITIONS["Heavy"])
+    return light + np.multiply.outer(level, heavy - light)
+
+
+def decode_stage(batch):
+    """Phase 1: decodes each withered record and measures its withering fraction."""
+    from Irminsul import trikarma_purification, encode_record, compare_records, OBS_MAP, STATE_TABLE
+
+    for subject in batch:
+        if "error" in subject:
+            continue
+        try:
+            withered, invalid = encode_record(str(subject.pop("withered")))
+            if not withered.size or invalid.size:
+                raise ValueError("withered must use only P, H, E, C, A, D, G or W")
+            _, path = trikarma_purification(withered, return_indices=True)
+            subject["withering"] = float(np.count_nonzero(withered == OBS_MAP['W']) / withered.size)
+
+            pure = subject.pop("pure", None)
+            if pure:
+                pure, invalid = encode_record(str(pure), STATE_TABLE)
+                if not invalid.size and pure.shape == withered.shape:
+                    subject["accuracy"] = compare_records(pure, path)[0]
+        except Exception as exc:
+            subject["error"] = f"{type(exc).__name__}: {exc}"
+    return batch
+
+
+def eleazar_stage(batch):
+    """Phase 2: runs the Eleazar model from the exposure set by the withering fraction."""
+    from scipy.integrate import odeint
+    from Eleazar import eleazar_model, BASE_PARAMS
+
+    t = np.linspace(0, DAYS, STEPS)
+    for subject in batch:
+        if "error" in subject:
+            continue
+        try:
+            y0 = exposure_y0(subject["withering"])
+            sol = odeint(eleazar_model, y0, t, args=(int(subject["age"]), bool(subject.get("vision", False)), BASE_PARAMS))
+            subject["y0"] = [round(float(v), 3) for v in y0]
+            subject["vitality"] = float(sol[-1, 0])
+            subject["failed"] = bool((sol[:, 0] < CRITICAL_VITALITY).any())
+        except Exception as exc:
+            subject["error"] = f"{type(exc).__name__}: {exc}"
+    return batch
+
+
+def delusion_stage(batch, boss_hp=500000, max_time=90):
+    """Phase 3: audits the whole batch at once, with budgets scaled by remaining Vitality."""
+    from Delusion.roster import make_roster, batch_audit, derive_stats
+
+    live = [subject for subject in batch if "error" not in subject]
+    if not live:
+        return batch
+    roster = make_roster(
+        [str(s.get("name", "Subject"))[:32] for s in live],
+        [float(s["age"]) for s in live],
+        [bool(s.get("vision", False)) for s in live],
+        [float(s["efficiency"]) for s in live],
+        np.clip([s["vitality"] / 100 for s in live], 0.0, 1.0),
+    )
+    stats = derive_stats(roster)
+    audit = batch_audit(roster, boss_hp=boss_hp, max_time=max_time, stats=stats)
+    for subject, row, budget in zip(live, audit, stats["budget"]):
+        subject["budget"] = float(budget)
+        subject["survived"] = bool(row["feasible"])
+        subject["cost"] = float(row["cost"]) if row["feasible"] else None
+        subject["rotation"] = [int(row["n_E"]), int(row["n_Q"])] if row["feasible"] else None
+    return batch
+
+
+def _stage_worker(name, fn, options, inbox, outbox, stats_queue, progress):
+    """Runs one stage on batches from inbox until it receives None, then reports its stats."""
+    stats = {"stage": name, "subjects": 0, "batches": 0, "busy": 0.0, "starved": 0.0, "blocked": 0.0}
+    try:
+        while True:
+            begin = time.perf_counter()
+            batch = inbox.get()
+            stats["starved"] += time.perf_counter() - begin
+            if batch is None:
+                break
+
+            begin = time.perf_counter()
+            try:
+                batch = fn(batch, **options)
+            except Exception as exc:
+                # A failing batch is passed on with the error rather than lost with the worker
+                for subject in batch:
+                    subject.setdefault("error", f"{name}: {type(exc).__name__}: {exc}")
+            stats["busy"] += time.perf_counter() - begin
+
+            # Blocks while the next stage's queue is full (backpressure)
+            begin = time.perf_counter()
+            outbox.put(batch)
+            stats["blocked"] += time.perf_counter() - begin
+
+            stats["subjects"] += len(batch)
+            stats["batches"] += 1
+            with progress.get_lock():
+                progress.value += len(batch)
+    finally:
+        stats_queue.put(stats)
+
+
+def synthetic_cohort(n, record_length=256, seed=0):
+    """Random subjects, each with a pure record withered at its own exposure level."""
+    rng = np.random.default_rng(seed)
+    symbols = np.frombuffer(b"PHECADG", dtype=np.uint8)
+    for index in range(n):
+        pure = symbols[rng.integers(0, 7, record_length)]
+        withered = np.where(rng.random(record_length) < rng.uniform(0.0, 0.45), ord("W"), pure).astype(np.uint8)
+        yield index, {
+            "id": f"subject-{index}",
+            "age": int(rng.integers(10, 70)),
+            "vision": bool(rng.random() < 0.5),
+            "efficiency": round(float(rng.uniform(0.05, 0.95)), 3),
+            "withered": withered.tobytes().decode("ascii"),
+            "pure": pure.tobytes().decode("ascii"),
+        }
+
+
+def _subject(index, record):
+    """Checks one input record and converts its numeric fields; raises ValueError if it cannot run."""
+    if isinstance(record, str):
+        raise ValueError(record)
+    if not isinstance(record, dict):
+        raise ValueError("each record must be a JSON object")
+    if not all(key in record for key in ("withered", "age", "efficiency")):
+        raise ValueError("records need withered, age and efficiency")
+    try:
+        age, efficiency = float(record["age"]), float(record["efficiency"])
+    except (TypeError, ValueError):
+        raise ValueError("age and efficiency must be numbers") from None
+    if not (np.isfinite(age) and age > 0):
+        raise ValueError("age must be a positive number")
+    # Mastery efficiency is a fraction; above 2.4 the skill cooldown is no longer positive
+    if not 0.0 <= efficiency <= 1.0:
+        raise ValueError("efficiency must be between 0 and 1")
+    return dict(record, index=index, age=age, efficiency=efficiency, vision=bool(record.get("vision", False)))
+
+
+def _batches(records, batch_size):
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, batch_size))
+        if not chunk:
+            return
+        batch = []
+        for index, record in chunk:
+            try:
+                batch.append(_subject(index, record))
+            except ValueError as exc:
+                ids = {k: record[k] for k in ("id",) if k in record} if isinstance(record, dict) else {}
+                batch.append(dict(ids, index=index, error=str(exc)))
+        yield batch
+
+
+def run(records, workers=(1, 1, 1), batch_size=64, queue_size=8, boss_hp=500000, max_time=90,
+        progress_interval=10.0):
+    """
+    Streams (index, record) pairs through the three stages and yields each
+    finished subject. workers gives the process count per stage; every queue
+    holds at most queue_size batches. Per-stage stats are printed at the end.
+    """
+    ctx = mp.get_context()
+    queues = [ctx.Queue(maxsize=queue_size) for _ in range(len(STAGES) + 1)]
+    stats_queue = ctx.Queue()
+    progress = [ctx.Value("q", 0) for _ in STAGES]
+    functions = (decode_stage, eleazar_stage, delusion_stage)
+    options = ({}, {}, {"boss_hp": boss_hp, "max_time": max_time})
+
+    stages = []
+    for i, name in enumerate(STAGES):
+        procs = [
+            ctx.Process(target=_stage_worker, name=f"pipeline-{name}-{k}", daemon=True,
+                        args=(name, functions[i], options[i], queues[i], queues[i + 1], stats_queue, progress[i]))
+            for k in range(workers[i])
+        ]
+        for proc in procs:
+            proc.start()
+        stages.append(procs)
+
+    failures = []
+
+    def feed():
+        # Blocks on the first queue when the decoders fall behind
+        try:
+            for batch in _batches(records, batch_size):
+                queues[0].put(batch)
+        except Exception as exc:
+            # Reading the input failed: the batches already queued still finish
+            failures.append(exc)
+        finally:
+            for _ in stages[0]:
+                queues[0].put(None)
+
+    def close(i):
+        # Once every worker of stage i has exited, stop the workers of stage i + 1
+        for proc in stages[i]:
+            proc.join()
+        for _ in stages[i + 1] if i + 1 < len(stages) else [None]:
+            queues[i + 1].put(None)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += [threading.Thread(target=close, args=(i,), daemon=True) for i in range(len(STAGES))]
+    for thread in threads:
+        thread.start()
+
+    start = last_report = time.perf_counter()
+    done = 0
+    while True:
+        batch = queues[-1].get()
+        if batch is None:
+            break
+        for subject in batch:
+            done += 1
+            yield subject
+        if progress_interval and time.perf_counter() - last_report >= progress_interval:
+            last_report = time.perf_counter()
+            counts = " | ".join(f"{name} {value.value:,}" for name, value in zip(STAGES, progress))
+            print(f"pipeline: {done:,} done in {last_report - start:.0f}s ({counts})", file=sys.stderr)
+
+    procs = [proc for stage in stages for proc in stage]
+    stats = []
+    while len(stats) < len(procs):
+        try:
+            stats.append(stats_queue.get(timeout=1.0))
+        except queue.Empty:
+            # A worker that was killed never reports
+            if not any(proc.is_alive() for proc in procs):
+                break
+    _report(stats, workers, time.perf_counter() - start, done)
+    dead = [proc for proc in procs if proc.exitcode]
+    if dead:
+        print(f"pipeline: {len(dead)} worker(s) died ({', '.join(f'{p.name} exit {p.exitcode}' for p in dead)}); "
+              "their batches are missing from the results", file=sys.stderr)
+    if failures:
+        raise failures[0]
+
+
+def _report(stats, workers, elapsed, done):
+    print(f"pipeline: {done:,} subjects in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f}/s)", file=sys.stderr)
+    print(f"{'stage':>10} {'workers':>8} {'subjects':>10} {'busy (s)':>9} {'per worker/s':>13} "
+          f"{'starved (s)':>12} {'blocked (s)':>12}", file=sys.stderr)
+    for i, name in enumerate(STAGES):
+        rows = [s for s in stats if s["stage"] == name]
+        subjects = sum(s["subjects"] for s in rows)
+        busy = sum(s["busy"] for s in rows)
+        print(f"{name:>10} {workers[i]:>8} {subjects:>10,} {busy:>9.1f} {subjects / busy if busy else 0:>13.1f} "
+              f"{sum(s['starved'] for s in rows):>12.1f} {sum(s['blocked'] for s in rows):>12.1f}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("input", nargs="?", help="JSON/NDJSON cohort file (default: stdin)")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="generate a random cohort of N subjects instead")
+    parser.add_argument("--record-length", type=int, default=256, help="record length of synthetic subjects")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--decode-workers", type=int, default=1)
+    parser.add_argument("--eleazar-workers", type=int, default=1)
+    parser.add_argument("--delusion-workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=64, help="subjects per batch passed between stages")
+    parser.add_argument("--queue-size", type=int, default=8, help="batches each queue holds before backpressure")
+    parser.add_argument("--boss-hp", type=float, default=500000)
+    parser.add_argument("--max-time", type=float, default=90)
+    parser.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines (0: off)")
+    args = parser.parse_args(argv)
+
+    workers = (args.decode_workers, args.eleazar_workers, args.delusion_workers)
+    source = None
+    if args.synthetic is not None:
+        records = synthetic_cohort(args.synthetic, args.record_length, args.seed)
+    else:
+        source = open(args.input, encoding="utf-8") if args.input else sys.stdin
+        records = read_records(source)
+
+    try:
+        for subject in run(records, workers, args.batch_size, args.queue_size, args.boss_hp, args.max_time,
+                           args.progress):
+            sys.stdout.write(json.dumps(subject) + "\n")
+    except json.JSONDecodeError as exc:
+        # As in api.py: a malformed JSON array is reported as one error line
+        sys.stdout.write(json.dumps({"error": f"invalid JSON: {exc}"}) + "\n")
+        sys.exit(1)
+    finally:
+        if source is not None:
+            source.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,52 @@
+import os
 import gradio as gr # type: ignore
-from handlers import reconstruct_irminsul, simulate_triple_comparison, generate_phase3_plots, get_benchmark_stats
+from handlers import reconstruct_irminsul, simulate_triple_comparison, generate_phase3_plots, get_benchmark_stats, PLOT_MODE
+from handlers import decode_long_record, trellis_window, TRELLIS_WINDOW
+from workers import MAX_WORKERS
+from artifacts import lookup, warm_up
+import instrumentation
+
+# Waiting requests beyond this are rejected instead of piling up
+QUEUE_SIZE = int(os.environ.get("TEYVAT_QUEUE_SIZE", 64))
+
+# Default inputs of each tab; their outputs are precomputed at startup and
+# shown on page load (sample record for Phase 1)
+PHASE1_SAMPLE = ("DEEEPAHHG", "DEWEPWHWG")
+PHASE2_DEFAULTS = ("Traveler", 20, False, "Heavy")
+PHASE3_DEFAULTS = ("Traveler", 25, False, 0.5, 500000)
+
+def plot_component(label=None, **line_plot):
+    """gr.Plot for server-rendered figures, or a client-rendered gr.LinePlot in data mode."""
+    if PLOT_MODE == "data":
+        return gr.LinePlot(label=label, **line_plot)
+    return gr.Plot(label=label)
+
+def run_phase3(age, vis, eff, hp):
+    # Streams: 2D plot first, then the 3D ridge (coarse, then refined)
+    yield from generate_phase3_plots("Traveler", age, vis, eff, hp)
+
+def run_long_record(withered_file, pure_file):
+    summary, record = decode_long_record(withered_file, pure_file)
+    n_obs = 0 if record is None else record["path"].shape[0]
+    # Window starts are multiples of TRELLIS_WINDOW; a record that fits in
+    # one window has nothing to page through (Gradio needs maximum > minimum)
+    last_start = max(0, (n_obs - 1) // TRELLIS_WINDOW * TRELLIS_WINDOW)
+    window = gr.update(maximum=max(last_start, TRELLIS_WINDOW), value=0, interactive=last_start > 0)
+    return summary, record, window, trellis_window(record, 0)
+
+def load_phase1():
+    outputs = lookup("irminsul", *PHASE1_SAMPLE)
+    if outputs is None:
+        return (gr.update(),) * 4
+    return (*PHASE1_SAMPLE, *outputs)
+
+def load_phase2():
+    outputs = lookup("eleazar", *PHASE2_DEFAULTS)
+    return gr.update() if outputs is None else outputs
+
+def load_phase3():
+    outputs = lookup("delusion", *PHASE3_DEFAULTS)
+    return (gr.update(),) * 2 if outputs is None else outputs
 
 # Use darker Collei green (#6b8a26) for theme
 custom_theme = gr.themes.Soft(
@@ -39,7 +86,9 @@ with gr.Blocks(theme=custom_theme) as demo:
                 txt_output = gr.Textbox(label="Reconstructed Pure Record", lines=3)
             
             with gr.Column(scale=4):
-                plot_output = gr.Plot(label="Viterbi Trellis Visualization")
+                plot_output = plot_component("Viterbi Trellis Visualization", x="step", y="state", color="path",
+                                             x_title="Timeline of Withered Observations",
+                                             y_title="Elemental State (0=P, 1=H, 2=E, 3=C, 4=A, 5=D, 6=G)")
                 plot_caption = gr.Markdown("*The trellis diagram shows the Viterbi algorithm finding the most likely sequence of hidden elements (green path) that would produce the observed corrupted record. When the original pure record differs from the reconstruction, it is shown as a blue dashed line for comparison.*")
                 with gr.Accordion("Explain Accuracy", open=False):
                     gr.Markdown(
@@ -50,6 +99,26 @@ with gr.Blocks(theme=custom_theme) as demo:
                     )
         btn_run.click(fn=reconstruct_irminsul, inputs=[txt_pure, txt_withered], outputs=[txt_output, plot_output])
 
+        with gr.Accordion("Long Records (File Upload)", open=False):
+            gr.Markdown("Upload records of any length as text files (line breaks are ignored). "
+                        f"The trellis shows {TRELLIS_WINDOW} steps at a time; move the slider to page through the record.")
+            with gr.Row():
+                with gr.Column(scale=3):
+                    file_withered = gr.File(label="Withered Record File", file_types=[".txt"], type="filepath")
+                    file_pure = gr.File(label="Pure Record File (Optional)", file_types=[".txt"], type="filepath")
+                    btn_long = gr.Button("Decode File", variant="primary")
+                    txt_long_output = gr.Textbox(label="Decoding Summary", lines=6)
+
+                with gr.Column(scale=4):
+                    window_start = gr.Slider(0, TRELLIS_WINDOW, value=0, step=TRELLIS_WINDOW, label="Window Start")
+                    plot_window = plot_component("Viterbi Trellis Window", x="step", y="state", color="path",
+                                                 x_title="Position in Withered Record",
+                                                 y_title="Elemental State (0=P, 1=H, 2=E, 3=C, 4=A, 5=D, 6=G)")
+            long_record = gr.State(None)
+            btn_long.click(run_long_record, inputs=[file_withered, file_pure],
+                           outputs=[txt_long_output, long_record, window_start, plot_window])
+            window_start.release(trellis_window, inputs=[long_record, window_start], outputs=plot_window)
+
     with gr.Tab("Phase 2: Eleazar Kinetics"):
         gr.Markdown("## Project Overview")
         gr.Markdown(
@@ -67,18 +136,19 @@ with gr.Blocks(theme=custom_theme) as demo:
         
         with gr.Row():
             with gr.Column():
-                char_name = gr.Textbox(label="Character Name", value="Traveler")
-                age_slide = gr.Slider(10, 90, value=20, step=1, label="Subject Age")
-                vis_check = gr.Checkbox(label="Possesses Vision", value=False)
+                char_name = gr.Textbox(label="Character Name", value=PHASE2_DEFAULTS[0])
+                age_slide = gr.Slider(10, 90, value=PHASE2_DEFAULTS[1], step=1, label="Subject Age")
+                vis_check = gr.Checkbox(label="Possesses Vision", value=PHASE2_DEFAULTS[2])
                 initial_scenario = gr.Radio(
                     choices=["Heavy", "Medium", "Light"],
-                    value="Heavy",
+                    value=PHASE2_DEFAULTS[3],
                     label="Initial Contamination"
                 )
                 run_btn = gr.Button("Analyze Reliability", variant="primary")
                 
             with gr.Column():
-                plot_out = gr.Plot()
+                plot_out = plot_component(x="day", y="percent", color="series",
+                                          x_title="Days Since Exposure", y_title="Vitality / Scales (%)")
                 plot_caption_eleazar = gr.Markdown(
                     "*Note: by changing the initial starting parameters, we can get different scenarios, "
                     "where all patients recover or non Vision holders failing to recover. By selecting Scenario 1, we demonstrate "
@@ -109,21 +179,44 @@ with gr.Blocks(theme=custom_theme) as demo:
         
         with gr.Row():
             with gr.Column(scale=1):
-                age_in = gr.Slider(15, 70, value=25, step=1, label="Age")
-                eff_in = gr.Slider(0.01, 0.8, value=0.5, step=0.01, label="Mastery Efficiency (η)")
-                vis_in = gr.Checkbox(label="Vision", value=False)
-                hp_in = gr.Slider(0, 1500000, value=500000, step=50000, label="Boss HP")
+                age_in = gr.Slider(15, 70, value=PHASE3_DEFAULTS[1], step=1, label="Age")
+                eff_in = gr.Slider(0.01, 0.8, value=PHASE3_DEFAULTS[3], step=0.01, label="Mastery Efficiency (η)")
+                vis_in = gr.Checkbox(label="Vision", value=PHASE3_DEFAULTS[2])
+                hp_in = gr.Slider(0, 1500000, value=PHASE3_DEFAULTS[4], step=50000, label="Boss HP")
                 btn_phase3 = gr.Button("Run Simulation", variant="primary")
                 
             with gr.Column(scale=2):
                 with gr.Tabs():
                     with gr.Tab("2D Analysis"):
-                        plot_2d = gr.Plot(label="Cumulative Cost vs. Damage")
+                        plot_2d = plot_component("Cumulative Cost vs. Damage", x="hp", y="cost", color="subject",
+                                                 x_title="Total Damage Required (Boss HP)",
+                                                 y_title="Gavrilov Redundancy Cost (R-Loss)")
                         gr.Markdown("*The 2D plot shows cumulative biological cost vs. combat output. **Skull markers (☠) indicate biological collapse points** where the subject's redundancy budget is exhausted and the solver returns 'Infeasible', marking immediate biological liquidation. Red dashed lines mark critical thresholds at 0% (baseline) and 15% (critical instability).*")
                     with gr.Tab("3D Survival Ridge"):
-                        plot_3d = gr.Plot(label="Topographic Mortality Mapping")
+                        plot_3d = plot_component("Topographic Mortality Mapping", x="hp", y="R", color="efficiency",
+                                                 x_title="Combat Load (Boss HP)",
+                                                 y_title="Biological Redundancy (R)")
                         gr.Markdown("*The 3D surface shows biological redundancy as a function of mastery efficiency and combat load. The \"Death Valley\" at 0.15 represents the critical failure threshold where Delusion use becomes fatal.*")
                         
-        btn_phase3.click(lambda age, vis, eff, hp: generate_phase3_plots("Traveler", age, vis, eff, hp),
+        btn_phase3.click(run_phase3,
                         inputs=[age_in, vis_in, eff_in, hp_in], 
                         outputs=[plot_2d, plot_3d])
+
+    # Precomputed default views appear without waiting for a click
+    demo.load(load_phase1, outputs=[txt_pure, txt_withered, txt_output, plot_output])
+    demo.load(load_phase2, outputs=plot_out)
+    demo.load(load_phase3, outputs=[plot_2d, plot_3d])
+
+# Serve up to MAX_WORKERS requests per event in parallel; handlers draw on
+# their own Figure objects through the bounded worker pool
+demo.queue(default_concurrency_limit=MAX_WORKERS, max_size=QUEUE_SIZE)
+
+# Render the defaults in the background; binding the port never waits on this
+warm_up([
+    (reconstruct_irminsul, PHASE1_SAMPLE),
+    (simulate_triple_comparison, PHASE2_DEFAULTS),
+    (generate_phase3_plots, PHASE3_DEFAULTS),
+])
+
+# TEYVAT_METRICS=1: periodic span/counter log line and optional /metrics endpoint
+instrumentation.start()
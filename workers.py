@@ -0,0 +1,52 @@
+import functools
+import inspect
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+
+# Bounded pool shared by every handler: compute and figure rendering run here,
+# so the number of simultaneous heavy jobs (and live figures) stays capped
+# no matter how many Gradio requests are in flight.
+MAX_WORKERS = int(os.environ.get("TEYVAT_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="teyvat-worker")
+
+
+def run(fn, *args, **kwargs):
+    """Runs fn on the worker pool and blocks the calling thread until it is done."""
+    if not instrumentation.ENABLED:
+        return _pool.submit(fn, *args, **kwargs).result()
+
+    submitted = time.perf_counter()
+
+    def queued():
+        # Time spent waiting for a free worker
+        instrumentation.record("pool.wait", time.perf_counter() - submitted)
+        return fn(*args, **kwargs)
+    return _pool.submit(queued).result()
+
+
+def pooled(fn):
+    """
+    Decorator that routes every call of a handler through the worker pool.
+    Generator handlers run one step (up to their next yield) per pool job, so
+    a streaming request holds a worker only while it is computing a chunk.
+    """
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def stream(*args, **kwargs):
+            steps = fn(*args, **kwargs)
+            while True:
+                try:
+                    item = run(next, steps)
+                except StopIteration:
+                    return
+                yield item
+        return stream
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return run(fn, *args, **kwargs)
+    return wrapper